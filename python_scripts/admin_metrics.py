@@ -0,0 +1,165 @@
+import time
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase, to_utc
+
+# One compact document the admin pages read in a single request
+STATS_COLLECTION = "adminStats"
+STATS_DOC = "dashboard"
+
+# Seconds each group of metrics stays valid
+GROUP_TTL = {
+    "users": 300,
+    "orders": 60,
+    "reports": 60,
+    "helpCenter": 60,
+    "catalog": 300
+}
+
+ORDER_STATUSES = ["Pending", "Processed", "Out For Delivery", "Received", "Cancelled"]
+OPEN_REPORT_STATUSES = ["Pending", "Investigating"]
+
+# (group, key, collection, filters, aggregation, field) over fields the generators populate
+METRICS = [
+    ("users", "total", "users", [], "count", None),
+    *[("users", role, "users", [("role", "==", role)], "count", None) for role in ("buyer", "seller", "admin")],
+    ("users", "walletBalance", "users", [], "sum", "walletBalance"),
+    ("orders", "total", "orders", [], "count", None),
+    *[("orders", status, "orders", [("status", "==", status)], "count", None) for status in ORDER_STATUSES],
+    # orders.price is the total paid for the order, as written by checkout
+    ("orders", "receivedRevenue", "orders", [("status", "==", "Received")], "sum", "price"),
+    ("reports", "total", "reports", [], "count", None),
+    ("reports", "open", "reports", [("status", "in", OPEN_REPORT_STATUSES)], "count", None),
+    ("helpCenter", "pending", "helpCenterRequests", [("status", "==", "Pending")], "count", None),
+    ("catalog", "products", "products", [], "count", None)
+]
+
+def aggregate(db, collection, filters, aggregation, field):
+    """Run one count() or sum() aggregation on the server and return its value."""
+    query = db.collection(collection)
+    for path, op, value in filters:
+        query = query.where(path, op, value)
+    query = query.count(alias="value") if aggregation == "count" else query.sum(field, alias="value")
+    result = query.get()[0][0].value
+    return result if result is not None else 0
+
+class MetricsService:
+    """Compute dashboard metrics with aggregation queries, recomputing only groups whose TTL ran out."""
+
+    def __init__(self, db, ttl=None, workers=8):
+        self.db = db
+        self.ttl = {**GROUP_TTL, **(ttl or {})}
+        self.workers = workers
+        self.values = {group: {} for group in self.ttl}
+        self.computed_at = {}  # group -> UTC datetime
+        self.stats = {"queries": 0}
+
+    def load(self):
+        """Seed the cache from the stored stats doc, so one-shot runs also honour the TTLs."""
+        snapshot = self.db.collection(STATS_COLLECTION).document(STATS_DOC).get()
+        if not snapshot.exists:
+            return
+        data = snapshot.to_dict() or {}
+        for group, computed_at in (data.get('computedAt') or {}).items():
+            computed_at = to_utc(computed_at)
+            if group in self.ttl and computed_at and isinstance(data.get(group), dict):
+                self.values[group] = data[group]
+                self.computed_at[group] = computed_at
+
+    def expired(self, now):
+        """Return the groups never computed or older than their TTL."""
+        return [group for group in self.ttl
+                if group not in self.computed_at or (now - self.computed_at[group]).total_seconds() >= self.ttl[group]]
+
+    def refresh(self, force=False):
+        """Recompute expired groups in parallel and return the groups that were recomputed."""
+        from google.api_core import exceptions as api_exceptions
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        groups = list(self.ttl) if force else self.expired(now)
+        metrics = [metric for metric in METRICS if metric[0] in groups]
+        if not metrics:
+            return []
+
+        def run(metric):
+            try:
+                return aggregate(self.db, *metric[2:]), None
+            except api_exceptions.GoogleAPICallError as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(run, metrics))
+        self.stats["queries"] += len(metrics)
+
+        values = {group: {} for group in groups}
+        failed = {}
+        for (group, key, *_), (value, error) in zip(metrics, results):
+            if error:
+                failed.setdefault(group, f"{key}: {error}")
+            values[group][key] = value
+
+        # A group with any failed query keeps its previous values and is retried next time
+        for group in groups:
+            if group in failed:
+                print(f"Could not refresh {group}, keeping previous values ({failed[group]})")
+                continue
+            self.values[group] = values[group]
+            self.computed_at[group] = now
+        return [group for group in groups if group not in failed]
+
+    def document(self):
+        """Return the stats doc: one map per group plus when each was computed."""
+        return {**self.values, "computedAt": dict(self.computed_at),
+                "updatedAt": max(self.computed_at.values(), default=None)}
+
+    def write(self):
+        self.db.collection(STATS_COLLECTION).document(STATS_DOC).set(self.document())
+
+def print_metrics(values):
+    """Print one line per metric group."""
+    for group, metrics in values.items():
+        print(f"{group}: " + ", ".join(f"{key}={value}" for key, value in metrics.items()))
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compute admin dashboard metrics with aggregation queries.")
+    parser.add_argument("--force", action="store_true", help="recompute every group regardless of its TTL")
+    parser.add_argument("--ttl", type=int, help="seconds every group stays valid, overriding the defaults")
+    parser.add_argument("--workers", type=int, default=8, help="aggregation queries in flight at once")
+    parser.add_argument("--watch", action="store_true", help="keep refreshing groups as their TTLs run out")
+    parser.add_argument("--interval", type=float, default=15.0, help="seconds between TTL checks with --watch")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting admin metrics...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    ttl = {group: args.ttl for group in GROUP_TTL} if args.ttl is not None else None
+    service = MetricsService(db, ttl, args.workers)
+    service.load()
+
+    while True:
+        start = time.perf_counter()
+        queries = service.stats["queries"]
+        groups = service.refresh(args.force)
+        if groups:
+            service.write()
+            print(f"Recomputed {', '.join(groups)} with {service.stats['queries'] - queries} aggregation queries "
+                  f"in {time.perf_counter() - start:.2f}s")
+            print_metrics({group: service.values[group] for group in groups})
+        else:
+            print("Nothing recomputed")
+        if not args.watch:
+            break
+        args.force = False
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
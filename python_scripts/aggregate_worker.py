@@ -0,0 +1,215 @@
+import time
+import argparse
+import threading
+from collections import defaultdict
+
+from firebase_common import initialize_firebase, commit_in_batches
+
+# Orders in these statuses do not count toward revenue
+EXCLUDED_STATUSES = {"Cancelled"}
+
+# Every listened document contributes a small tuple to the in-memory aggregates.
+# A change swaps the old contribution for the new one and marks the affected
+# target documents dirty, and flush() writes each dirty target once no matter
+# how many changes touched it since the last flush.
+class AggregateWorker:
+    """Keep derived fields up to date from on_snapshot change events."""
+
+    def __init__(self, db, reconcile=False):
+        self.db = db
+        self.reconcile = reconcile
+        self.lock = threading.Lock()
+        self.synced = set()
+
+        # Last contribution of every listened document, keyed by document path
+        self.order_contributions = {}
+        self.review_contributions = {}
+        self.message_contributions = {}
+
+        # Aggregates
+        self.seller_ratings = defaultdict(lambda: [0, 0])  # sellerId -> [rating sum, review count]
+        self.seller_revenue = defaultdict(float)  # sellerId -> revenue of non-cancelled orders
+        self.chat_unread = defaultdict(lambda: defaultdict(int))  # chatId -> senderId -> unread messages
+        self.chat_participants = {}
+
+        # Targets waiting for the next flush
+        self.dirty_ratings = set()
+        self.dirty_revenue = set()
+        self.dirty_chats = set()
+
+        self.watches = []
+        self.changes_seen = 0
+
+    def start(self):
+        """Subscribe to orders, reviews and every messages subcollection."""
+        self.watches = [
+            self.db.collection('orders').on_snapshot(self.listener('orders', self.apply_order)),
+            self.db.collection('reviews').on_snapshot(self.listener('reviews', self.apply_review)),
+            self.db.collection_group('messages').on_snapshot(self.listener('messages', self.apply_message))
+        ]
+
+    def stop(self):
+        """Unsubscribe all listeners."""
+        for watch in self.watches:
+            watch.unsubscribe()
+        self.watches = []
+
+    def listener(self, name, apply_change):
+        """Build an on_snapshot callback that applies each change under the lock."""
+        def on_snapshot(doc_snapshots, changes, read_time):
+            with self.lock:
+                # The first snapshot replays the whole collection as ADDED
+                initial = name not in self.synced
+                for change in changes:
+                    doc = change.document
+                    data = None if change.type.name == "REMOVED" else doc.to_dict()
+                    apply_change(doc, data, initial)
+                    self.changes_seen += 1
+                self.synced.add(name)
+                if initial:
+                    print(f"Initial snapshot of {name}: {len(changes)} documents")
+        return on_snapshot
+
+    def mark(self, dirty_set, key, initial):
+        """Mark a target dirty unless this is an initial load without reconcile."""
+        if key and (not initial or self.reconcile):
+            dirty_set.add(key)
+
+    def apply_order(self, doc, data, initial):
+        """Apply an order change to seller revenue."""
+        old = self.order_contributions.pop(doc.reference.path, None)
+        new = None
+        if data and data.get('sellerId'):
+            counted = data.get('status') not in EXCLUDED_STATUSES
+            new = (data['sellerId'], float(data.get('price') or 0) if counted else 0.0)
+            self.order_contributions[doc.reference.path] = new
+
+        for contribution, sign in ((old, -1), (new, 1)):
+            if not contribution:
+                continue
+            seller_id, revenue = contribution
+            self.seller_revenue[seller_id] += sign * revenue
+            self.mark(self.dirty_revenue, seller_id, initial)
+
+    def apply_review(self, doc, data, initial):
+        """Apply a review change to the seller's rating."""
+        old = self.review_contributions.pop(doc.reference.path, None)
+        new = None
+        if data and data.get('sellerId') and data.get('rating') is not None:
+            new = (data['sellerId'], float(data['rating']))
+            self.review_contributions[doc.reference.path] = new
+
+        for contribution, sign in ((old, -1), (new, 1)):
+            if not contribution:
+                continue
+            seller_id, rating = contribution
+            totals = self.seller_ratings[seller_id]
+            totals[0] += sign * rating
+            totals[1] += sign
+            self.mark(self.dirty_ratings, seller_id, initial)
+
+    def apply_message(self, doc, data, initial):
+        """Apply a message change to its chat's unread counts."""
+        # Messages live in chats/{chatId}/messages
+        chat_id = doc.reference.parent.parent.id
+        old = self.message_contributions.pop(doc.reference.path, None)
+        new = None
+        if data and data.get('senderId'):
+            new = (chat_id, data['senderId'], 0 if data.get('isRead', True) else 1)
+            self.message_contributions[doc.reference.path] = new
+
+        for contribution, sign in ((old, -1), (new, 1)):
+            if not contribution:
+                continue
+            chat, sender_id, unread = contribution
+            if unread:
+                self.chat_unread[chat][sender_id] += sign
+                self.mark(self.dirty_chats, chat, initial)
+
+    def get_participants(self, chat_id):
+        """Return a chat's participants, reading the chat doc once."""
+        if chat_id not in self.chat_participants:
+            snapshot = self.db.collection('chats').document(chat_id).get(field_paths=['participants'])
+            self.chat_participants[chat_id] = (snapshot.to_dict() or {}).get('participants', []) if snapshot.exists else []
+        return self.chat_participants[chat_id]
+
+    def collect_updates(self):
+        """Swap out the dirty targets and build one update per target document."""
+        with self.lock:
+            dirty_ratings, self.dirty_ratings = self.dirty_ratings, set()
+            dirty_revenue, self.dirty_revenue = self.dirty_revenue, set()
+            dirty_chats, self.dirty_chats = self.dirty_chats, set()
+
+            user_updates = defaultdict(dict)
+            for seller_id in dirty_ratings:
+                rating_sum, review_count = self.seller_ratings[seller_id]
+                user_updates[seller_id]['rating'] = round(rating_sum / review_count, 1) if review_count else 0.0
+                user_updates[seller_id]['reviewCount'] = review_count
+            for seller_id in dirty_revenue:
+                user_updates[seller_id]['totalRevenue'] = round(self.seller_revenue[seller_id], 2)
+
+            chat_unread = {chat_id: dict(self.chat_unread[chat_id]) for chat_id in dirty_chats}
+
+        updates = []
+        for user_id, fields in user_updates.items():
+            updates.append((self.db.collection('users').document(user_id), fields))
+
+        # A participant's unread count is the unread messages the others sent
+        for chat_id, unread_by_sender in chat_unread.items():
+            participants = self.get_participants(chat_id)
+            if not participants:
+                continue
+            unread_count = {
+                participant: sum(count for sender, count in unread_by_sender.items() if sender != participant)
+                for participant in participants
+            }
+            updates.append((self.db.collection('chats').document(chat_id), {'unreadCount': unread_count}))
+
+        return updates
+
+    def flush(self):
+        """Write all coalesced updates in batches."""
+        updates = self.collect_updates()
+        if not updates:
+            return 0
+        written = commit_in_batches(self.db, updates, merge=True)
+        print(f"Flushed {written} document updates ({self.changes_seen} changes seen so far)")
+        return written
+
+def run_worker(db, flush_interval=5.0, reconcile=False):
+    """Run the worker until interrupted, flushing at a fixed interval."""
+    worker = AggregateWorker(db, reconcile=reconcile)
+    worker.start()
+    print(f"Listening for changes, flushing every {flush_interval} seconds. Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(flush_interval)
+            worker.flush()
+    except KeyboardInterrupt:
+        print("\nStopping listeners...")
+    finally:
+        worker.stop()
+        worker.flush()
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Maintain seller ratings, revenue and unread counts from live changes.")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="seconds between batched flushes")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="also rewrite every derived field from the initial snapshot")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting aggregate worker...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    run_worker(db, args.flush_interval, args.reconcile)
+
+if __name__ == "__main__":
+    main()
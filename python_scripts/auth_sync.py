@@ -0,0 +1,178 @@
+import hmac
+import hashlib
+import secrets
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase
+from read_loader import DocumentLoader
+
+# Password given to accounts created by sync, as in create_auth_accounts.py
+DEFAULT_PASSWORD = "password"
+
+# auth.import_users() and auth.delete_users() take at most 1000 accounts per call
+AUTH_CHUNK_SIZE = 1000
+
+PROFILE_FIELDS = ['email', 'username']
+
+def auth_accounts():
+    """Return {uid: (email, display name)} for every Auth account, streamed page by page."""
+    from firebase_admin import auth
+    return {user.uid: (user.email or None, user.display_name or None) for user in auth.list_users().iterate_all()}
+
+def firestore_users(db, with_profiles=False):
+    """Return {uid: (email, username)} from users, or {uid: None} with a key-only scan."""
+    query = db.collection('users').select(PROFILE_FIELDS if with_profiles else [])
+    if not with_profiles:
+        return {doc.id: None for doc in query.stream()}
+    users = {}
+    for doc in query.stream():
+        data = doc.to_dict() or {}
+        users[doc.id] = (data.get('email') or None, data.get('username') or None)
+    return users
+
+def profile_changes(firestore_profile, auth_profile):
+    """Return the update_user() arguments that bring an account in line with its users doc."""
+    if firestore_profile is None:
+        return {}
+    email, username = firestore_profile
+    auth_email, auth_name = auth_profile
+    changes = {}
+    # Auth stores emails lowercased, and a field missing from the users doc is left alone
+    if email and email.lower() != (auth_email or "").lower():
+        changes["email"] = email
+    if username and username != auth_name:
+        changes["display_name"] = username
+    return changes
+
+def diff(auth_side, firestore_side):
+    """Return (uids to create, uids to delete, {uid: changes} for accounts whose email or name differ)."""
+    auth_ids, firestore_ids = auth_side.keys(), firestore_side.keys()
+    missing = sorted(firestore_ids - auth_ids)
+    extra = sorted(auth_ids - firestore_ids)
+    changed = {}
+    for uid in sorted(firestore_ids & auth_ids):
+        changes = profile_changes(firestore_side[uid], auth_side[uid])
+        if changes:
+            changed[uid] = changes
+    return missing, extra, changed
+
+def chunks(items, size=AUTH_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def create_missing(db, uids, password=DEFAULT_PASSWORD):
+    """Import Auth accounts for users docs in chunks of 1000 and return (created, skipped, errors)."""
+    from firebase_admin import auth
+
+    # Profiles of the missing users only, fetched with batched get_all()
+    loader = DocumentLoader(db, field_paths=PROFILE_FIELDS, cache_size=0)
+    key = secrets.token_bytes(32)
+    password_hash = hmac.new(key, password.encode("utf-8"), hashlib.sha256).digest()
+    hash_alg = auth.UserImportHash.hmac_sha256(key=key)
+
+    created = skipped = 0
+    errors = []
+    for chunk in chunks(uids):
+        profiles = loader.load_many(f"users/{uid}" for uid in chunk)
+        records = []
+        for uid in chunk:
+            profile = profiles[f"users/{uid}"] or {}
+            if not profile.get('email'):
+                print(f"Skipping user {uid} - No email address found.")
+                skipped += 1
+                continue
+            records.append(auth.ImportUserRecord(uid=uid, email=profile['email'],
+                                                 display_name=profile.get('username'),
+                                                 password_hash=password_hash))
+        if not records:
+            continue
+        result = auth.import_users(records, hash_alg=hash_alg)
+        created += result.success_count
+        errors.extend(f"create {records[error.index].uid}: {error.reason}" for error in result.errors)
+    return created, skipped, errors
+
+def delete_extra(uids):
+    """Delete Auth accounts without a users doc in chunks of 1000 and return (deleted, errors)."""
+    from firebase_admin import auth
+    deleted = 0
+    errors = []
+    for chunk in chunks(uids):
+        result = auth.delete_users(chunk)
+        deleted += result.success_count
+        errors.extend(f"delete {chunk[error.index]}: {error.reason}" for error in result.errors)
+    return deleted, errors
+
+def update_changed(changed, workers=8):
+    """Apply {uid: changes} to Auth accounts in parallel and return (updated, errors)."""
+    from firebase_admin import auth
+
+    def update(item):
+        uid, changes = item
+        try:
+            auth.update_user(uid, **changes)
+            return None
+        except Exception as e:
+            return f"update {uid}: {e}"
+
+    # The Admin SDK has no bulk update, so updates run concurrently instead
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        errors = [error for error in executor.map(update, changed.items()) if error]
+    return len(changed) - len(errors), errors
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Bring Firebase Auth accounts in line with the users collection.")
+    parser.add_argument("--profiles", action="store_true",
+                        help="also compare email and username and update accounts that differ")
+    parser.add_argument("--delete", action="store_true",
+                        help="delete Auth accounts that have no users doc (including signups still being written)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password for created accounts")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent profile updates")
+    parser.add_argument("--dry-run", action="store_true", help="print the differences without changing anything")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting Auth sync...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    auth_side = auth_accounts()
+    firestore_side = firestore_users(db, args.profiles)
+    missing, extra, changed = diff(auth_side, firestore_side)
+    print(f"{len(auth_side)} Auth accounts, {len(firestore_side)} users docs")
+    print(f"{len(missing)} to create, {len(extra)} without a users doc, {len(changed)} to update")
+
+    if args.dry_run:
+        for label, uids in (("create", missing), ("delete" if args.delete else "keep", extra), ("update", changed)):
+            for uid in uids:
+                print(f"  {label} {uid}")
+        return
+
+    created, skipped, errors = create_missing(db, missing, args.password) if missing else (0, 0, [])
+    deleted = 0
+    if extra and args.delete:
+        deleted, delete_errors = delete_extra(extra)
+        errors += delete_errors
+    updated = 0
+    if changed:
+        updated, update_errors = update_changed(changed, args.workers)
+        errors += update_errors
+
+    print("\nSummary:")
+    print(f"Accounts created: {created}")
+    print(f"Accounts deleted: {deleted}")
+    if extra and not args.delete:
+        print(f"Accounts without a users doc kept: {len(extra)} (pass --delete to remove them)")
+    print(f"Accounts updated: {updated}")
+    print(f"Users skipped: {skipped}")
+    print(f"Errors: {len(errors)}")
+    for error in errors:
+        print(f"  {error}")
+
+if __name__ == "__main__":
+    main()
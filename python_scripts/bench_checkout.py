@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase, commit_in_batches, percentile
+from checkout_engine import checkout, DEFAULT_MAX_ATTEMPTS
+
+def load_participants(db):
+    """Load buyer IDs and purchasable products with projected queries."""
+    buyers = [doc.id for doc in db.collection('users').where('role', '==', 'buyer').select([]).stream()]
+    products = [doc.id for doc in db.collection('products').select(['sellerId']).stream()
+                if (doc.to_dict() or {}).get('sellerId')]
+    return buyers, products
+
+def top_up(db, buyers, products, stock=1000000, balance=1000000000):
+    """Give every benchmark product and buyer enough stock and balance to never reject."""
+    writes = [(db.collection('products').document(product_id), {'stock': stock}) for product_id in products]
+    writes += [(db.collection('users').document(buyer_id), {'walletBalance': balance}) for buyer_id in buyers]
+    return commit_in_batches(db, writes, merge=True)
+
+def plan_purchases(buyers, products, num_purchases, hot_fraction, hot_share):
+    """Pick (buyer, product, hot) for each purchase with a skew toward hot products."""
+    shuffled = random.sample(products, len(products))
+    hot_count = max(1, int(len(shuffled) * hot_fraction))
+    hot, cold = shuffled[:hot_count], shuffled[hot_count:] or shuffled[:hot_count]
+
+    plan = []
+    for _ in range(num_purchases):
+        is_hot = random.random() < hot_share
+        plan.append((random.choice(buyers), random.choice(hot if is_hot else cold), is_hot))
+    return plan
+
+def summarize(results, elapsed):
+    """Compute throughput, abort and retry rates and latency percentiles."""
+    def stats(subset):
+        latencies = sorted(result["latencyMs"] for result in subset)
+        attempts = sum(result["attempts"] for result in subset)
+        committed = sum(1 for result in subset if result["status"] == "committed")
+        aborted = sum(1 for result in subset if result["status"] == "aborted")
+        return {
+            "purchases": len(subset),
+            "committed": committed,
+            "rejected": sum(1 for result in subset if result["status"] == "rejected"),
+            "aborted": aborted,
+            "abortRate": round(aborted / len(subset), 4) if subset else 0.0,
+            "failed": sum(1 for result in subset if result["status"] == "failed"),
+            # Every attempt after the first is a retry caused by contention
+            "retries": attempts - len(subset),
+            "retryRate": round((attempts - len(subset)) / attempts, 4) if attempts else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0
+        }
+
+    summary = stats(results)
+    summary["elapsedSeconds"] = round(elapsed, 2)
+    summary["commitsPerSecond"] = round(summary["committed"] / elapsed, 2) if elapsed else 0.0
+    summary["hot"] = stats([result for result in results if result["hot"]])
+    summary["cold"] = stats([result for result in results if not result["hot"]])
+    return summary
+
+def run_benchmark(db, plan, concurrency, max_attempts, sharded=False):
+    """Fire the planned purchases from concurrent workers."""
+    def purchase(entry):
+        buyer_id, product_id, is_hot = entry
+        result = checkout(db, buyer_id, product_id, 1, max_attempts, sharded)
+        result["hot"] = is_hot
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(purchase, plan))
+    return summarize(results, time.perf_counter() - start)
+
+def print_summary(summary):
+    """Print overall and hot/cold contention numbers."""
+    print(f"\nElapsed: {summary['elapsedSeconds']}s, {summary['commitsPerSecond']} commits/s")
+    print(f"\n{'':<8} {'purchases':>9} {'commits':>8} {'rejected':>8} {'aborted':>8} {'failed':>7} {'retry %':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, stats in (("all", summary), ("hot", summary["hot"]), ("cold", summary["cold"])):
+        print(f"{name:<8} {stats['purchases']:>9} {stats['committed']:>8} {stats['rejected']:>8} "
+              f"{stats['aborted']:>8} {stats['failed']:>7} {stats['retryRate'] * 100:>8.1f} {stats['p50_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent checkouts on hot products.")
+    parser.add_argument("--emulator-host", default="localhost:8080",
+                        help="Firestore emulator host, or an empty string for the real project")
+    parser.add_argument("--purchases", type=int, default=1000, help="number of checkouts to fire")
+    parser.add_argument("--concurrency", type=int, default=32, help="checkouts in flight at once")
+    parser.add_argument("--hot-fraction", type=float, default=0.01, help="fraction of products that are hot")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="fraction of purchases that hit hot products")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="transaction attempts")
+    parser.add_argument("--sharded", action="store_true",
+                        help="credit sellers through walletBalance shards (run sharded-counters migrate first)")
+    parser.add_argument("--top-up", action="store_true",
+                        help="raise stock and buyer balances first so no checkout is rejected")
+    parser.add_argument("--output", help="write the summary to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting checkout contention benchmark...")
+
+    # The Firestore client library switches to the emulator when this is set
+    if args.emulator_host:
+        os.environ["FIRESTORE_EMULATOR_HOST"] = args.emulator_host
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    buyers, products = load_participants(db)
+    if not buyers or not products:
+        print("No buyers or products found. Seed the database with populate_firebase_data.py first.")
+        return
+    print(f"Found {len(buyers)} buyers and {len(products)} products")
+
+    if args.top_up:
+        top_up(db, buyers, products)
+
+    plan = plan_purchases(buyers, products, args.purchases, args.hot_fraction, args.hot_share)
+    print(f"Firing {args.purchases} checkouts with {args.concurrency} in flight...")
+    summary = run_benchmark(db, plan, args.concurrency, args.max_attempts, args.sharded)
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSummary written to {args.output}")
+
+if __name__ == "__main__":
+    main()
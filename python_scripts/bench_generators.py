@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import datetime
+import platform
+import tracemalloc
+
+import populate_firebase_data as generators
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY_PATH = os.path.join(SCRIPT_DIR, "benchmarks", "generator_scaling.jsonl")
+
+# Products generate_product_data emits per call
+PRODUCTS_PER_CALL = 45
+
+def fixture_users(n):
+    user_ids = [f"user_{i}" for i in range(max(2, n))]
+    return [{"uid": user_id} for user_id in user_ids], user_ids
+
+def fixture_products(n, user_ids):
+    now = datetime.datetime.now()
+    return [{"id": f"product_{i}", "sellerId": user_ids[i % len(user_ids)], "price": 100 + i % 900,
+             "listedDate": now - datetime.timedelta(days=i % 90)} for i in range(n)]
+
+def fixture_orders(n, user_ids, status):
+    now = datetime.datetime.now()
+    return [{"id": f"order_{i}", "productId": f"product_{i}", "buyerId": user_ids[i % len(user_ids)],
+             "sellerId": user_ids[(i + 1) % len(user_ids)], "price": 100, "purchaseDate": now,
+             "status": status} for i in range(n)]
+
+# Each case builds untimed inputs for about n output records and returns the timed call
+def case_users(n):
+    return lambda: generators.generate_users(n)
+
+def case_products(n):
+    _, user_ids = fixture_users(n // 10)
+    calls = math.ceil(n / PRODUCTS_PER_CALL)
+    # The catalog is fixed, so the generator is scaled by calling it repeatedly
+    return lambda: [product for _ in range(calls) for product in generators.generate_product_data(user_ids)]
+
+def case_orders(n):
+    _, user_ids = fixture_users(n // 10)
+    products = fixture_products(n, user_ids)
+    return lambda: generators.generate_orders(products, user_ids, n)
+
+def case_reviews(n):
+    _, user_ids = fixture_users(n // 10)
+    orders = fixture_orders(n, user_ids, "Received")
+    return lambda: generators.generate_reviews(orders, n)
+
+def case_chats(n):
+    _, user_ids = fixture_users(n // 10)
+    products = fixture_products(n, user_ids)
+    return lambda: generators.generate_chats(products, user_ids, n)
+
+def case_messages(n):
+    _, user_ids = fixture_users(max(2, n // 100))
+    products = fixture_products(max(1, n // 6), user_ids)
+    # Chats average 6.5 messages with the default maximum of 10
+    chats = generators.generate_chats(products, user_ids, len(products))
+    return lambda: generators.generate_messages(chats, 10)
+
+def case_wallet_transactions(n):
+    users, user_ids = fixture_users(n // 10)
+    # Half the records are order pairs, half are random extras
+    orders = fixture_orders(n // 4, user_ids, "Processed")
+    return lambda: generators.generate_wallet_transactions(users, orders, n - 2 * len(orders))
+
+def case_reports(n):
+    _, user_ids = fixture_users(n // 10)
+    products = fixture_products(n, user_ids)
+    return lambda: generators.generate_reports(products, user_ids, n)
+
+CASES = {
+    "generate_users": case_users,
+    "generate_product_data": case_products,
+    "generate_orders": case_orders,
+    "generate_reviews": case_reviews,
+    "generate_chats": case_chats,
+    "generate_messages": case_messages,
+    "generate_wallet_transactions": case_wallet_transactions,
+    "generate_reports": case_reports
+}
+
+def geometric_scales(min_scale, max_scale, factor):
+    scales = []
+    scale = min_scale
+    while scale <= max_scale:
+        scales.append(scale)
+        scale *= factor
+    return scales
+
+def run_case(name, n, trace_memory=True):
+    """Time one generator at one scale, then measure its peak memory in a second run."""
+    random.seed(n)
+    call = CASES[name](n)
+    start = time.perf_counter()
+    records = len(call())
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        # Tracing slows allocation down, so it gets its own run
+        random.seed(n)
+        call = CASES[name](n)
+        tracemalloc.start()
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "scale": n,
+        "records": records,
+        "seconds": round(seconds, 4),
+        "recordsPerSecond": round(records / seconds, 1) if seconds else 0.0,
+        "peakBytes": peak
+    }
+
+def scaling_exponent(points):
+    """Fit seconds = c * records^k by least squares in log-log space and return k."""
+    points = [(math.log(p["records"]), math.log(p["seconds"])) for p in points
+              if p["records"] > 0 and p["seconds"] > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator, 3)
+
+def load_previous(history_path):
+    """Return the most recent recorded run, if any."""
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+def append_record(history_path, record):
+    """Append one run to the JSONL history file."""
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the data generators at geometric scales.")
+    parser.add_argument("--generators", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--min-scale", type=int, default=1000, help="smallest number of records")
+    parser.add_argument("--max-scale", type=int, default=100000, help="largest number of records")
+    parser.add_argument("--factor", type=int, default=10, help="growth between scales")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="fail if time grows faster than records^this")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="fail if throughput at any scale dropped by more than this many percent")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="JSONL file the results are appended to")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scales = geometric_scales(args.min_scale, args.max_scale, args.factor)
+    print(f"Benchmarking {len(args.generators)} generators at scales {scales}...")
+
+    previous = (load_previous(args.history) or {}).get("results", {})
+    results = {}
+    failures = []
+
+    print(f"\n{'generator':<30} {'scale':>9} {'records/s':>12} {'peak MiB':>9} {'change':>8}")
+    for name in args.generators:
+        points = []
+        try:
+            for n in scales:
+                point = run_case(name, n, not args.no_memory)
+                points.append(point)
+
+                change = ""
+                before = {p["scale"]: p for p in previous.get(name, {}).get("points", [])}.get(n)
+                if before and before["recordsPerSecond"]:
+                    percent = (point["recordsPerSecond"] - before["recordsPerSecond"]) / before["recordsPerSecond"] * 100
+                    change = f"{percent:+.1f}%"
+                    if args.max_regression is not None and -percent > args.max_regression:
+                        failures.append(f"{name} at {n}: throughput {percent:+.1f}%")
+                peak = f"{point['peakBytes'] / 1048576:.1f}" if point["peakBytes"] is not None else "-"
+                print(f"{name:<30} {n:>9} {point['recordsPerSecond']:>12} {peak:>9} {change:>8}")
+        except Exception as e:
+            # Generators with missing dependencies (generate_users needs Faker) are reported, not fatal
+            print(f"{name:<30} error: {e}")
+            results[name] = {"error": str(e)}
+            continue
+
+        exponent = scaling_exponent(points)
+        results[name] = {"points": points, "exponent": exponent}
+        print(f"{name:<30} scaling exponent {exponent}")
+        if exponent is not None and exponent > args.max_exponent:
+            failures.append(f"{name}: time grows as records^{exponent}")
+
+    append_record(args.history, {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "scales": scales,
+        "results": results
+    })
+    print(f"\nResults appended to {args.history}")
+
+    if failures:
+        print("Benchmark checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import datetime
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(SCRIPT_DIR, "benchmarks", "record_memory.jsonl")
+
+# In-memory layouts compared by the benchmark
+MODES = ("dict", "columns")
+
+def peak_rss_bytes():
+    """Return this process's peak resident set size in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def build_chats(num_chats, seed):
+    """Build chats the way the seed script does, without Faker or Firebase."""
+    from populate_firebase_data import generate_chats
+
+    random.seed(seed)
+    user_ids = [f"user_{i}" for i in range(max(2, num_chats // 10))]
+    products = [{"id": f"product_{i}", "sellerId": user_ids[i % len(user_ids)]} for i in range(num_chats)]
+    return generate_chats(products, user_ids, num_chats)
+
+def run_worker(mode, num_chats, messages_per_chat, seed):
+    """Generate messages with one layout and report its memory as JSON."""
+    from populate_firebase_data import generate_messages, generate_message_columns
+
+    chats = build_chats(num_chats, seed)
+    baseline = peak_rss_bytes()
+
+    start = time.perf_counter()
+    if mode == "dict":
+        messages = generate_messages(chats, messages_per_chat)
+    else:
+        messages = generate_message_columns(chats, messages_per_chat)
+    generate_seconds = time.perf_counter() - start
+
+    # Time the write-side materialization too; the dict path already holds dicts
+    start = time.perf_counter()
+    materialized = sum(1 for _ in messages)
+    iterate_seconds = time.perf_counter() - start
+
+    peak = peak_rss_bytes()
+    print(json.dumps({
+        "mode": mode,
+        "messages": materialized,
+        "peakRssBytes": peak,
+        "growthBytes": peak - baseline,
+        "bytesPerMessage": round((peak - baseline) / materialized, 1) if materialized else 0.0,
+        "generateSeconds": round(generate_seconds, 3),
+        "iterateSeconds": round(iterate_seconds, 3)
+    }))
+
+def measure(mode, num_chats, messages_per_chat, seed):
+    """Run one layout in a fresh interpreter so peak RSS is not shared."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", mode, "--chats", str(num_chats),
+         "--messages-per-chat", str(messages_per_chat), "--seed", str(seed)],
+        cwd=SCRIPT_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compare peak memory of dict and columnar message records.")
+    parser.add_argument("--chats", type=int, default=20000, help="number of chats to generate")
+    parser.add_argument("--messages-per-chat", type=int, default=100, help="maximum messages per chat")
+    parser.add_argument("--seed", type=int, default=42, help="random seed shared by both layouts")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL file results are appended to")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.worker:
+        run_worker(args.worker, args.chats, args.messages_per_chat, args.seed)
+        return
+
+    print(f"Generating messages for {args.chats} chats with up to {args.messages_per_chat} messages each...")
+    results = [measure(mode, args.chats, args.messages_per_chat, args.seed) for mode in MODES]
+
+    print(f"\n{'layout':<10} {'messages':>10} {'peak MiB':>10} {'growth MiB':>11} {'B/msg':>8} "
+          f"{'generate s':>11} {'iterate s':>10}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['messages']:>10} {result['peakRssBytes'] / 1048576:>10.1f} "
+              f"{result['growthBytes'] / 1048576:>11.1f} {result['bytesPerMessage']:>8} "
+              f"{result['generateSeconds']:>11} {result['iterateSeconds']:>10}")
+
+    dict_growth, columns_growth = results[0]["growthBytes"], results[1]["growthBytes"]
+    if columns_growth > 0:
+        print(f"\nColumns use {dict_growth / columns_growth:.1f}x less memory than dicts")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "chats": args.chats,
+            "messagesPerChat": args.messages_per_chat,
+            "results": results
+        }) + "\n")
+    print(f"Results appended to {args.history}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import time
+
+from marketplace_cli import COMMANDS
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY_PATH = os.path.join(SCRIPT_DIR, "benchmarks", "startup_times.jsonl")
+
+def time_command(code, runs):
+    """Run a snippet in fresh interpreters and return wall times in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            return None, error
+        times.append(elapsed)
+    return times, None
+
+def measure_startup(runs=5):
+    """Measure cold-start time of the interpreter and of every subcommand."""
+    results = {}
+
+    # Bare interpreter start, so command numbers can be read as overhead on top of it
+    snippets = {"python": "pass"}
+    snippets.update({name: f"import marketplace_cli; marketplace_cli.load_command({name!r})" for name in COMMANDS})
+
+    for name, code in snippets.items():
+        times, error = time_command(code, runs)
+        if error:
+            results[name] = {"error": error}
+        else:
+            results[name] = {"median_ms": round(statistics.median(times), 1), "min_ms": round(min(times), 1)}
+
+    return results
+
+def load_previous(history_path):
+    """Return the most recent recorded run, if any."""
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+def append_record(history_path, record):
+    """Append one run to the JSONL history file."""
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure and track cold-start time of each CLI subcommand.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreter runs per command")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="JSONL file the results are appended to")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="exit with an error if any command got slower than this many percent")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print(f"Measuring cold start over {args.runs} runs per command...")
+
+    results = measure_startup(args.runs)
+    previous = load_previous(args.history)
+    regressions = []
+
+    print(f"\n{'command':<22} {'median ms':>10} {'min ms':>8} {'change':>8}")
+    for name, timing in results.items():
+        if "error" in timing:
+            print(f"{name:<22} error: {timing['error']}")
+            continue
+
+        change = ""
+        before = (previous or {}).get("results", {}).get(name, {}).get("median_ms")
+        if before:
+            percent = (timing["median_ms"] - before) / before * 100
+            change = f"{percent:+.1f}%"
+            if args.max_regression is not None and percent > args.max_regression:
+                regressions.append(name)
+        print(f"{name:<22} {timing['median_ms']:>10} {timing['min_ms']:>8} {change:>8}")
+
+    append_record(args.history, {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "results": results
+    })
+    print(f"\nResults appended to {args.history}")
+
+    if regressions:
+        print(f"Startup regressed by more than {args.max_regression}% for: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
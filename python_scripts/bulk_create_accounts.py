@@ -0,0 +1,194 @@
+from firebase_admin import auth
+import os
+import csv
+import json
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase
+from profiling import PhaseProfiler, add_profiling_args
+from create_admin import validate_email, validate_wallet_balance
+
+# Default values used by the interactive create_* scripts
+DEFAULT_PROFILE_IMAGE_URL = "https://i.pinimg.com/1200x/2c/47/d5/2c47d5dd5b532f83bb55c4cd6f5bd1ef.jpg"
+DEFAULT_PASSWORDS = {
+    "buyer": "buyerpassword",
+    "seller": "sellerpassword",
+    "admin": "adminpassword"
+}
+
+RESULT_FIELDS = ["row", "email", "role", "status", "uid", "error"]
+
+def read_accounts(input_path):
+    """Read account rows from a CSV or JSONL file."""
+    rows = []
+    if input_path.endswith(".jsonl"):
+        with open(input_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+    else:
+        with open(input_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    return rows
+
+def validate_account(row):
+    """Validate one input row and return (account, error)."""
+    email = (row.get("email") or "").strip()
+    role = (row.get("role") or "").strip().lower()
+    wallet_balance = str(row.get("walletBalance") or "0").strip()
+
+    if not validate_email(email):
+        return None, "Invalid email format"
+    if role not in DEFAULT_PASSWORDS:
+        return None, f"Invalid role '{role}'"
+    if not validate_wallet_balance(wallet_balance):
+        return None, "Invalid wallet balance"
+
+    account = {
+        "email": email,
+        "username": (row.get("username") or "").strip() or email.split("@")[0],
+        "address": (row.get("address") or "").strip(),
+        "role": role,
+        "walletBalance": float(wallet_balance),
+        "password": (row.get("password") or "").strip() or DEFAULT_PASSWORDS[role]
+    }
+    return account, None
+
+def create_auth_user(account):
+    """Create the Firebase Authentication account and return (uid, error)."""
+    try:
+        user_record = auth.create_user(
+            email=account["email"],
+            password=account["password"],
+            display_name=account["username"],
+            disabled=False
+        )
+        return user_record.uid, None
+    except Exception as e:
+        return None, str(e)
+
+def provision_chunk(db, executor, chunk):
+    """Create Auth accounts in parallel and their users docs in one batch."""
+    results = []
+    auth_results = executor.map(create_auth_user, [account for _, account in chunk])
+
+    batch = db.batch()
+    created = []
+    current_time = datetime.datetime.now()
+
+    for (row_number, account), (uid, error) in zip(chunk, auth_results):
+        result = {"row": row_number, "email": account["email"], "role": account["role"],
+                  "status": "failed", "uid": uid or "", "error": error or ""}
+        results.append(result)
+        if error:
+            continue
+
+        user_data = {
+            'uid': uid,
+            'username': account["username"],
+            'email': account["email"],
+            'profileImageUrl': DEFAULT_PROFILE_IMAGE_URL,
+            'address': account["address"],
+            'joinDate': current_time,
+            'lastUpdated': current_time,
+            'role': account["role"],
+            'walletBalance': account["walletBalance"]
+        }
+        batch.set(db.collection('users').document(uid), user_data)
+        created.append(result)
+
+    if not created:
+        return results
+
+    try:
+        batch.commit()
+        for result in created:
+            result["status"] = "created"
+    except Exception as e:
+        # Roll back the Auth accounts so a retry of the same file starts clean
+        print(f"Error writing users docs: {e}")
+        for result in created:
+            result["error"] = f"Firestore write failed: {e}"
+            try:
+                auth.delete_user(result["uid"])
+            except Exception as delete_error:
+                result["error"] += f"; Auth rollback failed: {delete_error}"
+
+    return results
+
+def bulk_create_accounts(db, rows, chunk_size=100, workers=8):
+    """Validate all rows and provision the valid ones in parallel chunks."""
+    results = []
+    valid = []
+
+    for row_number, row in enumerate(rows, start=1):
+        account, error = validate_account(row)
+        if error:
+            results.append({"row": row_number, "email": row.get("email", ""), "role": row.get("role", ""),
+                            "status": "invalid", "uid": "", "error": error})
+        else:
+            valid.append((row_number, account))
+
+    print(f"{len(valid)} valid rows, {len(results)} invalid rows")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            results.extend(provision_chunk(db, executor, chunk))
+            print(f"Processed {min(start + chunk_size, len(valid))}/{len(valid)} accounts")
+
+    results.sort(key=lambda result: result["row"])
+    return results
+
+def write_results(output_path, results):
+    """Write one result line per input row."""
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Create buyer, seller and admin accounts from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV or JSONL file with email, username, address, role, walletBalance, password")
+    parser.add_argument("--output", help="result file (default: <input>_results.csv)")
+    # Firestore batches hold at most 500 writes
+    parser.add_argument("--chunk-size", type=int, default=100, help="accounts per chunk (max 500)")
+    parser.add_argument("--workers", type=int, default=8, help="parallel Auth requests")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    profiler = PhaseProfiler.from_args(args)
+    print("===== Bulk Account Creation =====\n")
+
+    if not os.path.exists(args.input):
+        print(f"Error: input file not found at {args.input}")
+        return
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}_results.csv"
+    rows = profiler.call(read_accounts, args.input)
+    print(f"Read {len(rows)} rows from {args.input}")
+
+    db = profiler.call(initialize_firebase)
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    results = profiler.call(bulk_create_accounts, db, rows, min(args.chunk_size, 500), args.workers)
+    profiler.call(write_results, output_path, results)
+
+    created = sum(1 for result in results if result["status"] == "created")
+    print("\n===== Bulk Account Creation Complete =====")
+    print(f"Created: {created}")
+    print(f"Invalid: {sum(1 for result in results if result['status'] == 'invalid')}")
+    print(f"Failed: {sum(1 for result in results if result['status'] == 'failed')}")
+    print(f"Results written to {output_path}")
+    profiler.report()
+
+if __name__ == "__main__":
+    main()
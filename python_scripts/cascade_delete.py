@@ -0,0 +1,190 @@
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase, delete_in_batches, BATCH_SIZE
+from sharded_counters import SHARDS_COLLECTION
+from sales_rollup import ROLLUP_COLLECTION
+from user_inboxes import INBOX_COLLECTION
+
+# Documents that reference a user, as (collection, field, operator)
+USER_DEPENDENTS = [
+    ('products', 'sellerId', '=='),
+    ('orders', 'buyerId', '=='),
+    ('orders', 'sellerId', '=='),
+    ('reviews', 'reviewerId', '=='),
+    ('reviews', 'sellerId', '=='),
+    ('chats', 'participants', 'array_contains'),
+    ('walletTransactions', 'userId', '=='),
+    ('reports', 'reporterId', '=='),
+    ('reports', 'sellerId', '=='),
+    ('helpCenterRequests', 'userId', '=='),
+    (ROLLUP_COLLECTION, 'sellerId', '==')
+]
+
+# Documents that reference a product
+PRODUCT_DEPENDENTS = [
+    ('orders', 'productId', '=='),
+    ('reviews', 'productId', '=='),
+    ('chats', 'productId', '=='),
+    ('reports', 'productId', '==')
+]
+
+# Firestore caps the values of an 'in' filter at 30
+IN_QUERY_LIMIT = 30
+
+# Sample paths printed per collection in dry-run output
+DRY_RUN_SAMPLES = 5
+
+class DeletionPlan:
+    """Document references to delete, grouped by collection path pattern."""
+
+    def __init__(self):
+        self.refs = {}  # path -> reference
+        self.by_group = defaultdict(list)  # e.g. 'chats/*/messages' -> paths
+
+    def add(self, doc_ref):
+        """Record a reference once; return True if it is new."""
+        if doc_ref.path in self.refs:
+            return False
+        self.refs[doc_ref.path] = doc_ref
+        parts = doc_ref.path.split('/')
+        group = '/'.join(part if i % 2 == 0 else '*' for i, part in enumerate(parts[:-1]))
+        self.by_group[group].append(doc_ref.path)
+        return True
+
+    def ids(self, collection_name):
+        """Return the IDs of planned top-level documents in a collection."""
+        return [path.split('/')[1] for path in self.by_group.get(collection_name, ())]
+
+def dependent_refs(db, collection_name, field, op, value):
+    """Run one key-only query and return the matching references."""
+    query = db.collection(collection_name).where(field, op, value).select([])
+    return [doc.reference for doc in query.stream()]
+
+def subcollection_refs(doc_ref, subcollection):
+    """List a subcollection's references without reading the documents."""
+    return list(doc_ref.collection(subcollection).list_documents())
+
+def run_parallel(executor, calls):
+    """Run (function, args) calls on the pool and yield each result list."""
+    futures = [executor.submit(function, *args) for function, args in calls]
+    for future in futures:
+        yield future.result()
+
+def resolve(db, user_ids=(), product_ids=(), workers=16):
+    """Walk the dependency graph from the given users and products."""
+    plan = DeletionPlan()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Roots and the documents keyed by their IDs
+        for user_id in user_ids:
+            plan.add(db.collection('users').document(user_id))
+            plan.add(db.collection(INBOX_COLLECTION).document(user_id))
+        for product_id in product_ids:
+            plan.add(db.collection('products').document(product_id))
+
+        # Round 1: everything that points at a root
+        calls = [(dependent_refs, (db, collection_name, field, op, user_id))
+                 for user_id in user_ids for collection_name, field, op in USER_DEPENDENTS]
+        calls += [(dependent_refs, (db, collection_name, field, op, product_id))
+                  for product_id in product_ids for collection_name, field, op in PRODUCT_DEPENDENTS]
+        new_products = []
+        for refs in run_parallel(executor, calls):
+            for ref in refs:
+                if plan.add(ref) and ref.parent.id == 'products':
+                    new_products.append(ref.id)
+
+        # Round 2: dependents of a removed seller's products
+        calls = [(dependent_refs, (db, collection_name, field, op, product_id))
+                 for product_id in new_products for collection_name, field, op in PRODUCT_DEPENDENTS]
+        for refs in run_parallel(executor, calls):
+            for ref in refs:
+                plan.add(ref)
+
+        # Round 3: reviews of removed orders left by other users. Counterparties'
+        # walletTransactions stay, since they record real balance changes.
+        order_ids = plan.ids('orders')
+        calls = [(dependent_refs, (db, 'reviews', 'orderId', 'in', order_ids[i:i + IN_QUERY_LIMIT]))
+                 for i in range(0, len(order_ids), IN_QUERY_LIMIT)]
+        # Subcollections: chat messages and counter shards of every removed owner
+        calls += [(subcollection_refs, (db.collection('chats').document(chat_id), 'messages'))
+                  for chat_id in plan.ids('chats')]
+        calls += [(subcollection_refs, (db.collection(collection_name).document(doc_id), SHARDS_COLLECTION))
+                  for collection_name in ('users', 'products', 'chats')
+                  for doc_id in plan.ids(collection_name)]
+        for refs in run_parallel(executor, calls):
+            for ref in refs:
+                plan.add(ref)
+
+    return plan
+
+def print_plan(plan):
+    """Print how many documents each collection would lose."""
+    print(f"\n{len(plan.refs)} documents would be deleted:")
+    for group in sorted(plan.by_group):
+        paths = plan.by_group[group]
+        print(f"  {group}: {len(paths)}")
+        for path in paths[:DRY_RUN_SAMPLES]:
+            print(f"    {path}")
+        if len(paths) > DRY_RUN_SAMPLES:
+            print(f"    ... and {len(paths) - DRY_RUN_SAMPLES} more")
+
+def execute(db, plan, workers=16):
+    """Delete planned documents in parallel batches, children before parents."""
+    levels = defaultdict(list)
+    for ref in plan.refs.values():
+        levels[ref.path.count('/')].append(ref)
+
+    deleted = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Finish each depth before the next so no parent goes before its children
+        for depth in sorted(levels, reverse=True):
+            level = levels[depth]
+            chunks = [level[i:i + BATCH_SIZE] for i in range(0, len(level), BATCH_SIZE)]
+            deleted += sum(executor.map(lambda chunk: delete_in_batches(db, chunk), chunks))
+    return deleted
+
+def delete_auth_accounts(user_ids):
+    """Remove the Firebase Authentication accounts of deleted users."""
+    from firebase_admin import auth
+
+    result = auth.delete_users(list(user_ids))
+    for error in result.errors:
+        print(f"Error deleting Auth account {user_ids[error.index]}: {error.reason}")
+    print(f"Deleted {result.success_count} Auth accounts")
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Delete users or products together with everything that depends on them.")
+    parser.add_argument("--user", nargs="+", default=[], help="user IDs to remove")
+    parser.add_argument("--product", nargs="+", default=[], help="product IDs to remove")
+    parser.add_argument("--dry-run", action="store_true", help="print what would be deleted without deleting")
+    parser.add_argument("--auth", action="store_true", help="also delete the users' Firebase Authentication accounts")
+    parser.add_argument("--workers", type=int, default=16, help="queries and batch commits in flight at once")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.user and not args.product:
+        print("Nothing to delete. Pass --user and/or --product.")
+        return
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    print("Resolving dependents...")
+    plan = resolve(db, args.user, args.product, args.workers)
+    print_plan(plan)
+    if args.dry_run:
+        print("\nDry run, nothing deleted.")
+        return
+
+    deleted = execute(db, plan, args.workers)
+    print(f"\nDeleted {deleted} documents")
+    if args.auth and args.user:
+        delete_auth_accounts(args.user)
+
+if __name__ == "__main__":
+    main()
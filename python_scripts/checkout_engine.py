@@ -0,0 +1,120 @@
+import time
+import uuid
+import random
+import datetime
+
+from sharded_counters import counter_num_shards, shard_ref
+
+# Attempts before a contended checkout gives up
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Start of the ValueError message the transactional wrapper raises once all attempts are used up
+RETRIES_EXHAUSTED_MESSAGE = "Failed to commit transaction in"
+
+class CheckoutRejected(Exception):
+    """Raised when a checkout fails a business rule such as stock or balance."""
+
+def checkout(db, buyer_id, product_id, quantity=1, max_attempts=DEFAULT_MAX_ATTEMPTS, sharded_seller_balance=False):
+    """Buy a product in one transaction, mirroring the app's checkout writes."""
+    from firebase_admin import firestore
+    from google.api_core import exceptions as api_exceptions
+
+    product_ref = db.collection('products').document(product_id)
+    buyer_ref = db.collection('users').document(buyer_id)
+    order_id = f"order_{uuid.uuid4().hex[:8]}"
+    attempts = 0
+
+    # Reads product and buyer, then writes stock, both balances, the order and
+    # its two walletTransactions. Firestore retries the function on contention.
+    @firestore.transactional
+    def run(transaction):
+        nonlocal attempts
+        attempts += 1
+
+        product_snapshot = product_ref.get(transaction=transaction)
+        buyer_snapshot = buyer_ref.get(transaction=transaction)
+        if not product_snapshot.exists:
+            raise CheckoutRejected("Product not found")
+        if not buyer_snapshot.exists:
+            raise CheckoutRejected("Buyer not found")
+
+        product = product_snapshot.to_dict()
+        stock = int(product.get('stock') or 0)
+        if stock < quantity:
+            raise CheckoutRejected("Out of stock")
+
+        # Order price is the total paid for all units, as in the app
+        total = round(float(product.get('price') or 0) * quantity, 2)
+        balance = float(buyer_snapshot.to_dict().get('walletBalance') or 0)
+        if balance < total:
+            raise CheckoutRejected("Insufficient wallet balance")
+
+        seller_id = product['sellerId']
+        now = datetime.datetime.now()
+
+        transaction.update(product_ref, {'stock': stock - quantity})
+        transaction.update(buyer_ref, {'walletBalance': round(balance - total, 2)})
+        # The seller is not read, so an increment keeps them out of the read set
+        seller_ref = db.collection('users').document(seller_id)
+        if sharded_seller_balance:
+            # Spread credits to busy sellers over the walletBalance shards
+            num_shards = counter_num_shards('walletBalance')
+            shard = random.randrange(num_shards)
+            transaction.set(shard_ref(seller_ref, 'walletBalance', shard),
+                            {"counter": "walletBalance", "shard": shard, "count": firestore.Increment(total)},
+                            merge=True)
+        else:
+            transaction.update(seller_ref, {'walletBalance': firestore.Increment(total)})
+
+        transaction.set(db.collection('orders').document(order_id), {
+            "id": order_id,
+            "productId": product_id,
+            "buyerId": buyer_id,
+            "sellerId": seller_id,
+            "quantity": quantity,
+            "price": total,
+            "originalPrice": product.get('price'),
+            "purchaseDate": now,
+            "status": "Pending"
+        })
+
+        for user_id, transaction_type, amount, description in (
+            (buyer_id, "Purchase", -total, f"Payment for order {order_id}"),
+            (seller_id, "Sale", total, f"Payment received for order {order_id}")
+        ):
+            transaction_id = f"transaction_{uuid.uuid4().hex[:8]}"
+            transaction.set(db.collection('walletTransactions').document(transaction_id), {
+                "id": transaction_id,
+                "userId": user_id,
+                "type": transaction_type,
+                "amount": amount,
+                "description": description,
+                "relatedOrderId": order_id,
+                "timestamp": now
+            })
+
+    start = time.perf_counter()
+    result = {"orderId": None, "error": None}
+    try:
+        run(db.transaction(max_attempts=max_attempts))
+        result["status"] = "committed"
+        result["orderId"] = order_id
+    except CheckoutRejected as e:
+        result["status"] = "rejected"
+        result["error"] = str(e)
+    except (api_exceptions.Aborted, api_exceptions.Conflict) as e:
+        result["status"] = "aborted"
+        result["error"] = str(e)
+    except ValueError as e:
+        # Only the wrapper's retries-exhausted error is contention; bad data such as a
+        # malformed stock value is a failure and must not inflate the abort rate
+        result["status"] = "aborted" if str(e).startswith(RETRIES_EXHAUSTED_MESSAGE) else "failed"
+        result["error"] = str(e)
+    except api_exceptions.GoogleAPICallError as e:
+        # Anything else from the API, such as a deleted seller or a timeout, fails this attempt only
+        result["status"] = "failed"
+        result["error"] = str(e)
+
+    result["attempts"] = attempts
+    result["latencyMs"] = (time.perf_counter() - start) * 1000
+    return result
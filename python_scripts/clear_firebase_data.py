@@ -1,34 +1,9 @@
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
-import os
+from firebase_admin import auth
 import time
+import argparse
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK with service account credentials."""
-    # Check if the credentials file exists
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    cred_path = os.path.join(script_dir, "secondhand-marketplace-app-firebase-adminsdk-fbsvc-8c45231694.json")
-    print(f"Looking for Firebase credentials at: {cred_path}")
-    
-    if not os.path.exists(cred_path):
-        print(f"Error: Firebase credentials file not found at {cred_path}")
-        print("Please download your Firebase service account key and save it as specified")
-        print("Instructions: https://firebase.google.com/docs/admin/setup#initialize-sdk")
-        return None
-    
-    try:
-        # Check if Firebase is already initialized
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        print("Firebase initialized successfully")
-        return db
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+from firebase_common import initialize_firebase
+from profiling import PhaseProfiler, add_profiling_args
 
 def clear_collection(db, collection_name):
     """Delete all documents in a collection."""
@@ -66,7 +41,11 @@ def clear_all_collections(db):
         'chats',
         'walletTransactions',
         'reports',
-        'helpCenterRequests'
+        'helpCenterRequests',
+        'sellerSalesRollups',
+        'featuredListings',
+        'userInboxes',
+        'adminStats'
     ]
     
     # Clear each collection
@@ -110,11 +89,19 @@ def clear_auth_accounts():
         traceback.print_exc()
         return False
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Delete all Firestore data and Firebase Authentication users.")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    profiler = PhaseProfiler.from_args(args)
     print("Starting Firebase data clearing script...")
     
     try:
-        db = initialize_firebase()
+        db = profiler.call(initialize_firebase)
         if not db:
             print("Failed to initialize Firebase. Exiting.")
             return
@@ -126,16 +113,18 @@ def main():
     
     try:
         # Clear all collections
-        clear_all_collections(db)
+        profiler.call(clear_all_collections, db)
         
         # Clear auth accounts
-        clear_auth_accounts()
+        profiler.call(clear_auth_accounts)
         
         print("\nFirebase data and authentication clearing completed successfully.")
     except Exception as e:
         print(f"\nAn error occurred during data clearing: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        profiler.report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,271 @@
+import os
+import json
+import mmap
+import zlib
+import base64
+import argparse
+import datetime
+from collections import defaultdict
+
+from firebase_common import initialize_firebase, commit_in_batches, delete_in_batches
+
+# Archive files live next to the scripts unless --archive-dir says otherwise
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "archives")
+
+# Records per compressed frame; one frame is the unit read back on restore
+FRAME_RECORDS = 1000
+
+# Records buffered across all open keys before the largest buffers are written early
+MAX_BUFFERED_RECORDS = 10000
+
+# Archivable data sets and the key their index is grouped by
+ARCHIVE_KINDS = {
+    "messages": "chatId",
+    "walletTransactions": "userId"
+}
+
+def archive_paths(archive_dir, kind):
+    """Return the data and index file paths of an archive."""
+    return os.path.join(archive_dir, f"{kind}.archive"), os.path.join(archive_dir, f"{kind}.index.jsonl")
+
+def encode_value(value):
+    """Tag Firestore values JSON cannot hold so restore writes back the same types."""
+    if isinstance(value, datetime.datetime):
+        return {"__timestamp__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+
+    from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+    if isinstance(value, DocumentReference):
+        return {"__reference__": value.path}
+    if isinstance(value, GeoPoint):
+        return {"__geopoint__": [value.latitude, value.longitude]}
+    # Raised while the frame is built, before anything is written or deleted
+    raise TypeError(f"cannot archive a value of type {type(value).__name__}")
+
+def decode_object(obj, db=None):
+    """Turn tagged values back into timestamps, references, geopoints and bytes."""
+    if len(obj) != 1:
+        return obj
+    tag, value = next(iter(obj.items()))
+    if tag == "__timestamp__":
+        return datetime.datetime.fromisoformat(value)
+    if tag == "__reference__" and db is not None:
+        return db.document(value)
+    if tag == "__geopoint__":
+        from google.cloud.firestore_v1 import GeoPoint
+        return GeoPoint(*value)
+    if tag == "__bytes__":
+        return base64.b64decode(value)
+    return obj
+
+class ArchiveWriter:
+    """Append compressed frames of records to one archive and index them by key."""
+
+    def __init__(self, archive_dir, kind, max_buffered=MAX_BUFFERED_RECORDS):
+        os.makedirs(archive_dir, exist_ok=True)
+        self.kind = kind
+        self.max_buffered = max_buffered
+        data_path, index_path = archive_paths(archive_dir, kind)
+        self.data_file = open(data_path, "ab")
+        self.index_file = open(index_path, "a", encoding="utf-8")
+        self.buffers = defaultdict(list)  # key -> [(reference, record)]
+        self.buffered = 0
+        self.archived = 0
+
+    def add(self, key, doc):
+        """Buffer one document; return the references of any frames that became durable."""
+        self.buffers[key].append((doc.reference, {"id": doc.id, "data": doc.to_dict() or {}}))
+        self.buffered += 1
+        if len(self.buffers[key]) >= FRAME_RECORDS:
+            return self.write_frame(key)
+        if self.buffered >= self.max_buffered:
+            return self.write_largest()
+        return []
+
+    def write_largest(self):
+        """Write the largest buffers until at most half the cap is buffered."""
+        references = []
+        for key in sorted(self.buffers, key=lambda k: len(self.buffers[k]), reverse=True):
+            if self.buffered <= self.max_buffered // 2:
+                break
+            references.extend(self.write_frame(key))
+        return references
+
+    def write_frame(self, key):
+        """Compress one key's buffer, append it and record its offset."""
+        entries = self.buffers.pop(key, [])
+        if not entries:
+            return []
+        self.buffered -= len(entries)
+
+        payload = "\n".join(json.dumps(record, default=encode_value) for _, record in entries)
+        frame = zlib.compress(payload.encode("utf-8"), 6)
+        offset = self.data_file.seek(0, os.SEEK_END)
+        self.data_file.write(frame)
+        self.data_file.flush()
+        os.fsync(self.data_file.fileno())
+
+        # The index line goes last, so a crash never indexes a partial frame
+        self.index_file.write(json.dumps({
+            "key": key,
+            "offset": offset,
+            "length": len(frame),
+            "count": len(entries),
+            "archivedAt": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        }) + "\n")
+        self.index_file.flush()
+        os.fsync(self.index_file.fileno())
+
+        self.archived += len(entries)
+        return [reference for reference, _ in entries]
+
+    def flush(self):
+        """Write every remaining buffer and return their references."""
+        references = []
+        for key in list(self.buffers):
+            references.extend(self.write_frame(key))
+        return references
+
+    def close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+def old_message_docs(db, cutoff):
+    """Yield (chatId, message) for messages older than the cutoff, one chat at a time."""
+    # Per-chat queries use the automatic single-field index on timestamp
+    for chat in db.collection('chats').select([]).stream():
+        query = chat.reference.collection('messages').where('timestamp', '<', cutoff)
+        for doc in query.stream():
+            yield chat.id, doc
+
+def old_transaction_docs(db, cutoff):
+    """Yield (userId, transaction) for wallet transactions older than the cutoff."""
+    for doc in db.collection('walletTransactions').where('timestamp', '<', cutoff).stream():
+        yield (doc.to_dict() or {}).get('userId') or "unknown", doc
+
+def archive(db, kind, cutoff, archive_dir=DEFAULT_ARCHIVE_DIR, dry_run=False, max_buffered=MAX_BUFFERED_RECORDS):
+    """Move documents older than the cutoff into the archive, then delete them."""
+    docs = old_message_docs(db, cutoff) if kind == "messages" else old_transaction_docs(db, cutoff)
+    if dry_run:
+        counts = defaultdict(int)
+        for key, _ in docs:
+            counts[key] += 1
+        print(f"{sum(counts.values())} {kind} older than {cutoff.date()} across {len(counts)} "
+              f"{ARCHIVE_KINDS[kind]} values would be archived")
+        return 0
+
+    writer = ArchiveWriter(archive_dir, kind, max_buffered)
+    deleted = 0
+    previous = None
+    try:
+        for key, doc in docs:
+            # Messages arrive one chat at a time, so a chat's last frame is written when the next chat starts
+            if kind == "messages" and previous is not None and key != previous:
+                deleted += delete_in_batches(db, writer.write_frame(previous))
+            previous = key
+            # Each frame's documents are deleted as soon as the frame is on disk
+            deleted += delete_in_batches(db, writer.add(key, doc))
+        deleted += delete_in_batches(db, writer.flush())
+    finally:
+        writer.close()
+
+    print(f"Archived {writer.archived} {kind} and deleted {deleted} documents")
+    return deleted
+
+def load_index(index_path, key):
+    """Return the index entries of one key that were not restored yet, in archive order."""
+    entries = []
+    restored = set()
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["key"] != key:
+                continue
+            if entry.get("restored"):
+                restored.add(entry["offset"])
+            else:
+                entries.append(entry)
+    return [entry for entry in entries if entry["offset"] not in restored]
+
+def mark_restored(index_path, key, entries):
+    """Record restored frames so a later restore or archive run never duplicates them."""
+    restored_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    with open(index_path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps({"key": key, "offset": entry["offset"], "restored": True,
+                                "restoredAt": restored_at}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def read_records(archive_dir, kind, entries, db=None):
+    """Yield the records of the given index entries by memory-mapping the archive."""
+    if not entries:
+        return
+    data_path, _ = archive_paths(archive_dir, kind)
+
+    with open(data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # Only the indexed frames are paged in and decompressed
+        for entry in entries:
+            frame = data[entry["offset"]:entry["offset"] + entry["length"]]
+            for line in zlib.decompress(frame).decode("utf-8").splitlines():
+                yield json.loads(line, object_hook=lambda obj: decode_object(obj, db))
+
+def restore(db, kind, key, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Write one chat's messages or one user's ledger back to Firestore."""
+    if kind == "messages":
+        collection = db.collection('chats').document(key).collection('messages')
+    else:
+        collection = db.collection('walletTransactions')
+
+    _, index_path = archive_paths(archive_dir, kind)
+    entries = load_index(index_path, key) if os.path.exists(index_path) else []
+    writes = ((collection.document(record["id"]), record["data"])
+              for record in read_records(archive_dir, kind, entries, db))
+    restored = commit_in_batches(db, writes)
+    # Marked only after every write committed; an interrupted restore simply rewrites the same IDs
+    mark_restored(index_path, key, entries)
+    print(f"Restored {restored} {kind} for {ARCHIVE_KINDS[kind]} {key}")
+    return restored
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Archive old messages and wallet transactions to local cold storage.")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="directory of the archive files")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    archive_parser = subparsers.add_parser("archive", help="move old documents into the archive")
+    archive_parser.add_argument("--older-than-days", type=int, default=180, help="archive documents older than this")
+    archive_parser.add_argument("--kinds", nargs="+", default=list(ARCHIVE_KINDS), choices=list(ARCHIVE_KINDS))
+    archive_parser.add_argument("--dry-run", action="store_true", help="count what would be archived")
+    archive_parser.add_argument("--max-buffered", type=int, default=MAX_BUFFERED_RECORDS,
+                                help="documents held in memory before the largest groups are written early")
+
+    restore_parser = subparsers.add_parser("restore", help="rehydrate one chat or one user's ledger")
+    target = restore_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--chat", help="chat ID whose messages to restore")
+    target.add_argument("--user", help="user ID whose wallet transactions to restore")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    if args.action == "restore":
+        if args.chat:
+            restore(db, "messages", args.chat, args.archive_dir)
+        else:
+            restore(db, "walletTransactions", args.user, args.archive_dir)
+        return
+
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=args.older_than_days)
+    for kind in args.kinds:
+        print(f"Archiving {kind} older than {cutoff.date()}...")
+        archive(db, kind, cutoff, args.archive_dir, args.dry_run, args.max_buffered)
+
+if __name__ == "__main__":
+    main()
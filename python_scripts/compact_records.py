@@ -0,0 +1,93 @@
+import datetime
+from array import array
+
+# Generated timestamps are naive local time; they are stored as microseconds since this naive epoch
+NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Generated message IDs look like message_1a2b3c4d, so the hex part fits in 32 bits
+MESSAGE_ID_PREFIX = "message_"
+
+class StringTable:
+    """Store each distinct string once and refer to it by a small integer."""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def add(self, value):
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.values)
+            self.index[value] = position
+            self.values.append(value)
+        return position
+
+    def __getitem__(self, position):
+        return self.values[position]
+
+    def __len__(self):
+        return len(self.values)
+
+class MessageColumns:
+    """Generated messages kept column-wise; dicts are built only when written."""
+
+    def __init__(self):
+        self.ids = array('I')
+        self.odd_ids = {}  # row -> ID that does not match MESSAGE_ID_PREFIX + 8 hex digits
+        self.chat_rows = array('I')
+        self.sender_rows = array('I')
+        self.text_rows = array('I')
+        self.timestamps = array('q')
+        self.read = bytearray()
+        self.images = {}  # row -> imageUrl; only about 10% of messages have one
+        self.chats = StringTable()
+        self.users = StringTable()
+        self.texts = StringTable()
+
+    def append(self, message):
+        """Pack one message dict into the columns."""
+        row = len(self.ids)
+        message_id = message["id"]
+        suffix = message_id[len(MESSAGE_ID_PREFIX):]
+        if message_id.startswith(MESSAGE_ID_PREFIX) and len(suffix) == 8:
+            self.ids.append(int(suffix, 16))
+        else:
+            self.ids.append(0)
+            self.odd_ids[row] = message_id
+
+        self.chat_rows.append(self.chats.add(message["chatId"]))
+        self.sender_rows.append(self.users.add(message["senderId"]))
+        self.text_rows.append(self.texts.add(message["text"]))
+        self.timestamps.append((message["timestamp"] - NAIVE_EPOCH) // MICROSECOND)
+        self.read.append(1 if message["isRead"] else 0)
+        if message.get("imageUrl"):
+            self.images[row] = message["imageUrl"]
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, i):
+        """Materialize one message as the dict the dict path would have built."""
+        return {
+            "id": self.odd_ids.get(i) or f"{MESSAGE_ID_PREFIX}{self.ids[i]:08x}",
+            "senderId": self.users[self.sender_rows[i]],
+            "text": self.texts[self.text_rows[i]],
+            "timestamp": NAIVE_EPOCH + self.timestamps[i] * MICROSECOND,
+            "isRead": bool(self.read[i]),
+            "imageUrl": self.images.get(i),
+            "chatId": self.chats[self.chat_rows[i]]
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+def message_writes(db, columns):
+    """Yield (reference, dict) pairs for commit_in_batches, one message at a time."""
+    for message in columns:
+        yield db.collection('chats').document(message["chatId"]).collection('messages').document(message["id"]), message
@@ -1,22 +1,9 @@
-import firebase_admin
-from firebase_admin import credentials
 from firebase_admin import auth
-from firebase_admin import firestore
 import sys
-import os
+import argparse
 
-# Initialize Firebase Admin SDK
-def initialize_firebase():
-    try:
-        # Path to your Firebase service account key file
-        # You need to download this from Firebase Console > Project Settings > Service Accounts
-        cred_path = os.path.join(os.path.dirname(__file__), 'secondhand-marketplace-app-firebase-adminsdk-fbsvc-8c45231694.json')
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-        return True
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        return False
+from firebase_common import initialize_firebase
+from profiling import PhaseProfiler, add_profiling_args
 
 # Clear all existing auth accounts
 def clear_auth_accounts():
@@ -39,10 +26,7 @@ def clear_auth_accounts():
         return False
 
 # Create auth accounts for all users in Firestore
-def create_auth_accounts():
-    # Initialize Firestore client
-    db = firestore.client()
-    
+def create_auth_accounts(db):
     # Clear existing auth accounts first
     clear_auth_accounts()
     
@@ -104,19 +88,29 @@ def create_auth_accounts():
     print(f"Errors: {error_count}")
     print("\nGenerated passwords have been saved to 'generated_passwords.txt'")
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Create Firebase Authentication accounts for existing users.")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
 # Main function
 def main():
+    args = parse_args()
+    profiler = PhaseProfiler.from_args(args)
     print("Starting Firebase Auth account creation...")
     
     # Initialize Firebase Admin SDK
-    if not initialize_firebase():
+    db = profiler.call(initialize_firebase)
+    if not db:
         print("Failed to initialize Firebase. Exiting.")
         sys.exit(1)
     
     # Create auth accounts
-    create_auth_accounts()
+    profiler.call(create_auth_accounts, db)
     
     print("Process completed.")
+    profiler.report()
 
 if __name__ == "__main__":
     main()
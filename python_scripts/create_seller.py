@@ -1,37 +1,8 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
 from firebase_admin import auth
-import os
 import datetime
 import re
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK with service account credentials."""
-    # Check if the credentials file exists
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    cred_path = os.path.join(script_dir, "secondhand-marketplace-app-firebase-adminsdk-fbsvc-8c45231694.json")
-    print(f"Looking for Firebase credentials at: {cred_path}")
-    
-    if not os.path.exists(cred_path):
-        print(f"Error: Firebase credentials file not found at {cred_path}")
-        print("Please download your Firebase service account key and save it as specified")
-        print("Instructions: https://firebase.google.com/docs/admin/setup#initialize-sdk")
-        return None
-    
-    try:
-        # Check if Firebase is already initialized
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        print("Firebase initialized successfully")
-        return db
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+from firebase_common import initialize_firebase
 
 def validate_email(email):
     """Validate email format."""
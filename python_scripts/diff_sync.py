@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import datetime
+
+from firebase_common import commit_in_batches, delete_in_batches
+
+# Field holding a document's content hash in "field" mode
+HASH_FIELD = "_contentHash"
+
+# Previous run's path -> hash map in "manifest" mode
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sync_manifest.json")
+
+# Collections written by the seed script, with the field holding each document's ID
+FIXTURE_COLLECTIONS = {
+    "users": "uid",
+    "products": "id",
+    "orders": "id",
+    "reviews": "id",
+    "chats": "id",
+    "walletTransactions": "id",
+    "reports": "id"
+}
+
+def canonical_value(value):
+    """Make a value JSON serializable in a form that does not vary between runs."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
+
+def content_hash(data):
+    """Return a stable hash of a document's fields."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=canonical_value)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def fixture_documents(collections, messages):
+    """Yield (path, data) for every generated document."""
+    for collection_name, id_field in FIXTURE_COLLECTIONS.items():
+        for data in collections.get(collection_name, ()):
+            yield f"{collection_name}/{data[id_field]}", data
+    for message in messages:
+        yield f"chats/{message['chatId']}/messages/{message['id']}", message
+
+def load_manifest(path):
+    """Read the hashes written by the previous sync, or an empty map."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(path, hashes):
+    """Replace the manifest atomically so an interrupted run keeps the old one."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, sort_keys=True)
+    os.replace(temp_path, path)
+
+def stored_hashes(db):
+    """Read the hash field of every synced document in the fixture collections."""
+    hashes = {}
+    docs = [db.collection(collection_name).select([HASH_FIELD]).stream() for collection_name in FIXTURE_COLLECTIONS]
+    docs.append(db.collection_group('messages').select([HASH_FIELD]).stream())
+    for stream in docs:
+        for doc in stream:
+            digest = (doc.to_dict() or {}).get(HASH_FIELD)
+            # Documents without a hash were created by the app, not by a sync, and are never stale
+            if digest is not None:
+                hashes[doc.reference.path] = digest
+    return hashes
+
+def sync_fixture(db, collections, messages, mode="manifest", manifest_path=DEFAULT_MANIFEST):
+    """Write only new or changed documents and delete ones no longer generated."""
+    if not db:
+        return
+
+    # In manifest mode only documents a previous sync wrote are ever deleted.
+    # Field mode compares against the hashes stored in the database itself, so
+    # manual edits of synced documents are detected too. Documents the app
+    # created carry no hash and are left alone.
+    previous = load_manifest(manifest_path) if mode == "manifest" else stored_hashes(db)
+    print(f"Comparing against {len(previous)} {'manifest entries' if mode == 'manifest' else 'stored documents'}")
+
+    current = {}
+    changed = []
+    for path, data in fixture_documents(collections, messages):
+        digest = content_hash(data)
+        current[path] = digest
+        if previous.get(path) != digest:
+            if mode == "field":
+                data = dict(data, **{HASH_FIELD: digest})
+            changed.append((path, data))
+
+    stale = [path for path in previous if path not in current]
+    unchanged = len(current) - len(changed)
+    print(f"{len(changed)} new or changed, {unchanged} unchanged, {len(stale)} stale")
+
+    written = commit_in_batches(db, ((db.document(path), data) for path, data in changed))
+    # Deepest paths first so messages go before their chats
+    stale.sort(key=lambda path: -path.count('/'))
+    deleted = delete_in_batches(db, (db.document(path) for path in stale))
+
+    if mode == "manifest":
+        save_manifest(manifest_path, current)
+    print(f"Sync wrote {written} and deleted {deleted} documents")
+    return written, deleted
@@ -0,0 +1,61 @@
+import random
+from functools import lru_cache
+
+class AliasTable:
+    """Draw weighted indices in O(1) per sample with Vose's alias method."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        if not n:
+            raise ValueError("AliasTable needs at least one weight")
+        total = float(sum(weights))
+        scaled = [weight * n / total for weight in weights]
+        self.n = n
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            # The large column gives away what fills the small one
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is full up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self):
+        column = int(random.random() * self.n)
+        return column if random.random() < self.prob[column] else self.alias[column]
+
+def zipf_weights(n, exponent):
+    """Return the weights of ranks 1..n under a Zipf law with the given exponent."""
+    return [1.0 / rank ** exponent for rank in range(1, n + 1)]
+
+class ZipfChooser:
+    """Pick items with Zipf-distributed popularity in O(1) per draw."""
+
+    def __init__(self, items, exponent):
+        # Popularity ranks are shuffled so the hottest items are not simply the first IDs
+        self.items = random.sample(items, len(items))
+        self.table = AliasTable(zipf_weights(len(self.items), exponent))
+
+    def __call__(self):
+        return self.items[self.table.sample()]
+
+def chooser(items, exponent=0):
+    """Return a picker over items: uniform when exponent is 0, Zipf-skewed otherwise."""
+    if not exponent:
+        return lambda: random.choice(items)
+    return ZipfChooser(items, exponent)
+
+@lru_cache(maxsize=32)
+def _rank_table(n, exponent):
+    return AliasTable(zipf_weights(n, exponent))
+
+def power_law_int(low, high, exponent):
+    """Draw an integer in [low, high] where low is most likely and the tail is heavy."""
+    return low + _rank_table(high - low + 1, exponent).sample()
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import datetime
+import urllib.request
+
+from firebase_common import get_project_id, initialize_target_client, commit_in_batches
+import diff_sync
+import distributions
+from diff_sync import fixture_documents
+from profiling import PhaseProfiler
+import populate_firebase_data as generators
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, "emulator_cache")
+
+# Version recorded in firebase-export-metadata.json, as written by `firebase emulators:export`
+EXPORT_VERSION = "13.0.0"
+
+# Password of every exported account, as in create_auth_accounts.py
+DEFAULT_PASSWORD = "password"
+
+# Generated collection the Auth accounts are built from
+AUTH_SOURCE = "users"
+
+# Project the fixture is staged in on the emulator. "demo-" projects are never real
+# Firebase projects, so wiping one cannot touch a developer's emulator data.
+BUILD_PROJECT_PREFIX = "demo-export-"
+
+# Modules whose code decides the exported data
+SOURCE_MODULES = [generators, distributions, diff_sync]
+
+def cache_key(settings):
+    """Hash the generation settings and generator source so a cached export is reused only when valid."""
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    for module in SOURCE_MODULES + [sys.modules[__name__]]:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def millis(value):
+    return str(int(value.timestamp() * 1000))
+
+def auth_account(user, password=DEFAULT_PASSWORD):
+    """Build one account in the Auth emulator's accounts.json layout."""
+    created = user.get("joinDate") or generators.current_time()
+    salt = f"fakeSalt{hashlib.sha1(user['uid'].encode('utf-8')).hexdigest()[:20]}"
+    return {
+        "localId": user["uid"],
+        "createdAt": millis(created),
+        "lastLoginAt": millis(created),
+        "displayName": user.get("username"),
+        # The emulator stores passwords in this readable form instead of a real hash
+        "passwordHash": f"fakeHash:salt={salt}:password={password}",
+        "salt": salt,
+        "passwordUpdatedAt": int(millis(created)),
+        "providerUserInfo": [{
+            "providerId": "password",
+            "email": user["email"],
+            "federatedId": user["email"],
+            "rawId": user["email"],
+            "displayName": user.get("username")
+        }],
+        "validSince": str(int(created.timestamp())),
+        "email": user["email"],
+        "emailVerified": False,
+        "disabled": False
+    }
+
+def write_auth_export(export_dir, users, password=DEFAULT_PASSWORD):
+    """Write auth_export/ straight from generated users, without any Auth calls."""
+    auth_dir = os.path.join(export_dir, "auth_export")
+    os.makedirs(auth_dir, exist_ok=True)
+    accounts = [auth_account(user, password) for user in users if user.get("email")]
+    with open(os.path.join(auth_dir, "accounts.json"), "w", encoding="utf-8") as f:
+        json.dump({"kind": "identitytoolkit#DownloadAccountResponse", "users": accounts}, f)
+    with open(os.path.join(auth_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"signIn": {"allowDuplicateEmails": False}}, f)
+    return len(accounts)
+
+def emulator_request(host, method, path, body=None):
+    """Call an emulator REST endpoint and return the decoded JSON reply."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(f"http://{host}{path}", data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        payload = response.read()
+    return json.loads(payload) if payload else {}
+
+def write_firestore_export(export_dir, host, build_project, collections, messages):
+    """Stage the fixture in a throwaway emulator project and have the emulator export it to export_dir."""
+    database = f"projects/{build_project}/databases/(default)"
+    documents_path = f"/emulator/v1/{database}/documents"
+    # Only the throwaway project is cleared; other projects on the emulator keep their data
+    emulator_request(host, "DELETE", documents_path)
+    try:
+        db = initialize_target_client(f"emulator:{host}@{build_project}")
+        if not db:
+            raise RuntimeError(f"could not connect to the Firestore emulator at {host}")
+        written = commit_in_batches(db, ((db.document(path), data)
+                                         for path, data in fixture_documents(collections, messages)))
+
+        emulator_request(host, "POST", f"/emulator/v1/projects/{build_project}:export", {
+            "database": database,
+            "export_directory": os.path.abspath(export_dir),
+            "export_name": "firestore_export"
+        })
+    finally:
+        emulator_request(host, "DELETE", documents_path)
+    return written
+
+def write_metadata(export_dir, firestore=True):
+    """Write firebase-export-metadata.json, which `--import` reads first."""
+    metadata = {"version": EXPORT_VERSION, "auth": {"version": EXPORT_VERSION, "path": "auth_export"}}
+    if firestore:
+        metadata["firestore"] = {
+            "version": EXPORT_VERSION,
+            "path": "firestore_export",
+            "metadata_file": "firestore_export/firestore_export.overall_export_metadata"
+        }
+    with open(os.path.join(export_dir, "firebase-export-metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+def build_export(export_dir, args, build_project):
+    """Generate the fixture and write a complete emulator export into export_dir."""
+    skew = generators.DEFAULT_SKEW if args.skew else {}
+    generators.set_skew(**skew)
+    generators.set_seed(args.seed, args.as_of)
+    collections, messages = generators.generate_fixture(PhaseProfiler(), args.orders, args.reviews, args.chats,
+                                                        args.messages_per_chat)
+
+    accounts = write_auth_export(export_dir, collections[AUTH_SOURCE], args.password)
+    print(f"Wrote {accounts} Auth accounts")
+    if not args.auth_only:
+        written = write_firestore_export(export_dir, args.emulator, build_project, collections, messages)
+        print(f"Exported {written} Firestore documents")
+    write_metadata(export_dir, firestore=not args.auth_only)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build a cached emulator export that tests can start from with --import.")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the generated data")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, default=generators.DEFAULT_AS_OF,
+                        help=f"reference date of generated timestamps (default: {generators.DEFAULT_AS_OF})")
+    parser.add_argument("--orders", type=int, default=40, help="number of orders to generate")
+    parser.add_argument("--reviews", type=int, default=30, help="number of reviews to generate")
+    parser.add_argument("--chats", type=int, default=25, help="number of chats to generate")
+    parser.add_argument("--messages-per-chat", type=int, default=10, help="maximum messages per chat")
+    parser.add_argument("--skew", action="store_true", help="use the default Zipf skew of every distribution")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password of exported accounts")
+    parser.add_argument("--emulator", default=os.environ.get("FIRESTORE_EMULATOR_HOST"),
+                        help="HOST:PORT of a running Firestore emulator (default: $FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--auth-only", action="store_true", help="export only Auth accounts, no emulator needed")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory holding cached exports")
+    parser.add_argument("--rebuild", action="store_true", help="ignore a cached export with the same settings")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.auth_only and not args.emulator:
+        print("Firestore data is exported by a running emulator; pass --emulator HOST:PORT or --auth-only. Exiting.")
+        sys.exit(1)
+
+    project_id = get_project_id()
+    settings = {
+        "seed": args.seed, "asOf": args.as_of.isoformat(), "orders": args.orders, "reviews": args.reviews,
+        "chats": args.chats, "messagesPerChat": args.messages_per_chat, "skew": args.skew,
+        "password": args.password, "authOnly": args.auth_only
+    }
+    key = cache_key(settings)
+    export_dir = os.path.join(args.cache_dir, f"seed{args.seed}_{key}")
+
+    if os.path.exists(os.path.join(export_dir, "firebase-export-metadata.json")) and not args.rebuild:
+        print(f"Using cached export {export_dir}")
+    else:
+        # Built beside the cache entry and renamed into place, so a failed run never leaves a partial export
+        temp_dir = f"{export_dir}.tmp"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+        try:
+            build_export(temp_dir, args, f"{BUILD_PROJECT_PREFIX}{key}")
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            print(f"Error building emulator export: {e}")
+            sys.exit(1)
+        shutil.rmtree(export_dir, ignore_errors=True)
+        os.replace(temp_dir, export_dir)
+        print(f"Wrote export {export_dir}")
+
+    print(f"Start the emulators with: firebase emulators:start --project {project_id} --import {export_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+
+from firebase_common import initialize_firebase, commit_in_batches
+from read_loader import DocumentLoader, DEFAULT_TTL
+
+# Chats read per page
+PAGE_SIZE = 500
+
+def chat_pages(db, page_size=PAGE_SIZE, limit=None):
+    """Yield pages of chat snapshots with the fields enrichment needs."""
+    base = db.collection('chats').order_by('__name__').select(['participants', 'productId', 'participantNames', 'product'])
+    last = None
+    seen = 0
+    while limit is None or seen < limit:
+        size = page_size if limit is None else min(page_size, limit - seen)
+        query = base.start_after(last) if last else base
+        page = list(query.limit(size).stream())
+        if not page:
+            break
+        yield page
+        seen += len(page)
+        last = page[-1]
+
+def enrichment(data, users, products):
+    """Return the participantNames and product fields a chat should carry."""
+    names = {}
+    for user_id in data.get('participants') or []:
+        user = users.get(f"users/{user_id}")
+        names[user_id] = (user or {}).get('username') or "Unknown User"
+
+    fields = {"participantNames": names}
+    product_id = data.get('productId')
+    if product_id and product_id != "support":
+        product = products.get(f"products/{product_id}")
+        if product:
+            fields["product"] = {"name": product.get('name'), "price": product.get('price'),
+                                 "imageUrl": product.get('imageUrl')}
+    return fields
+
+def enrich(db, users, products, refresh=False, limit=None, dry_run=False):
+    """Attach participant names and product details to chats, reading each referenced doc once."""
+    scanned = 0
+    changed = 0
+    for page in chat_pages(db, limit=limit):
+        scanned += len(page)
+        chats = [(snapshot, snapshot.to_dict() or {}) for snapshot in page]
+        if not refresh:
+            chats = [(snapshot, data) for snapshot, data in chats if 'participantNames' not in data]
+
+        # Every reference in the page goes out in one get_all per collection
+        user_data = users.load_many({f"users/{user_id}" for _, data in chats
+                                     for user_id in data.get('participants') or []})
+        product_data = products.load_many({f"products/{data['productId']}" for _, data in chats
+                                           if data.get('productId')})
+
+        writes = []
+        for snapshot, data in chats:
+            fields = enrichment(data, user_data, product_data)
+            if any(data.get(key) != value for key, value in fields.items()):
+                writes.append((snapshot.reference, fields))
+        changed += len(writes)
+        if writes and not dry_run:
+            commit_in_batches(db, writes, merge=True)
+    return scanned, changed
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Denormalize participant names and product details into chats.")
+    parser.add_argument("--refresh", action="store_true", help="re-enrich chats that already have names")
+    parser.add_argument("--limit", type=int, help="maximum chats to scan")
+    parser.add_argument("--cache-size", type=int, default=10000, help="documents kept per cache")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds a cached document stays valid")
+    parser.add_argument("--dry-run", action="store_true", help="count chats that would change without writing")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting chat enrichment...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    users = DocumentLoader(db, field_paths=['username'], cache_size=args.cache_size, ttl=args.ttl)
+    products = DocumentLoader(db, field_paths=['name', 'price', 'imageUrl'], cache_size=args.cache_size, ttl=args.ttl)
+    scanned, changed = enrich(db, users, products, args.refresh, args.limit, args.dry_run)
+
+    verb = "would change" if args.dry_run else "updated"
+    print(f"Scanned {scanned} chats, {verb} {changed}")
+    print(f"users: {users.summary()}")
+    print(f"products: {products.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from firebase_common import initialize_firebase, to_utc
+
+# Column types of each collection, matching the documents written by the
+# generate_* functions in populate_firebase_data.py and by the app.
+COLLECTION_SCHEMAS = {
+    "users": [
+        ("uid", "string"), ("username", "string"), ("email", "string"),
+        ("profileImageUrl", "string"), ("address", "string"), ("joinDate", "timestamp"),
+        ("lastUpdated", "timestamp"), ("walletBalance", "double"), ("role", "string")
+    ],
+    "products": [
+        ("id", "string"), ("name", "string"), ("description", "string"), ("price", "double"),
+        ("minBargainPrice", "double"), ("imageUrl", "string"), ("category", "string"),
+        ("sellerId", "string"), ("condition", "string"), ("adBoost", "int64"),
+        ("listedDate", "timestamp"), ("stock", "int64")
+    ],
+    "orders": [
+        ("id", "string"), ("productId", "string"), ("buyerId", "string"), ("sellerId", "string"),
+        ("quantity", "int64"), ("price", "double"), ("originalPrice", "double"),
+        ("purchaseDate", "timestamp"), ("status", "string")
+    ],
+    "reviews": [
+        ("id", "string"), ("orderId", "string"), ("productId", "string"), ("reviewerId", "string"),
+        ("sellerId", "string"), ("rating", "int64"), ("text", "string"), ("imageUrl", "string"),
+        ("date", "timestamp")
+    ],
+    "chats": [
+        ("id", "string"), ("participants", "string_list"), ("productId", "string"),
+        ("lastMessage", "string"), ("lastMessageTimestamp", "timestamp"),
+        ("lastMessageSenderId", "string"), ("unreadCount", "int_map")
+    ],
+    "messages": [
+        ("id", "string"), ("senderId", "string"), ("text", "string"), ("timestamp", "timestamp"),
+        ("isRead", "bool"), ("imageUrl", "string"), ("chatId", "string")
+    ],
+    "walletTransactions": [
+        ("id", "string"), ("userId", "string"), ("type", "string"), ("amount", "double"),
+        ("description", "string"), ("relatedOrderId", "string"), ("timestamp", "timestamp")
+    ],
+    "reports": [
+        ("id", "string"), ("reporterId", "string"), ("productId", "string"), ("sellerId", "string"),
+        ("reason", "string"), ("description", "string"), ("timestamp", "timestamp"),
+        ("status", "string")
+    ]
+}
+
+def import_pyarrow():
+    """Import pyarrow, which only the export command needs."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        print("Error: pyarrow is required for exports. Install it with 'pip install pyarrow'.")
+        return None
+
+def arrow_type(pa, type_name):
+    """Map a schema type name to a pyarrow type."""
+    return {
+        "string": pa.string(),
+        "double": pa.float64(),
+        "int64": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "string_list": pa.list_(pa.string()),
+        "int_map": pa.map_(pa.string(), pa.int64())
+    }[type_name]
+
+def build_schema(pa, collection_name):
+    """Build the Arrow schema for a collection, with the document ID first."""
+    fields = [pa.field("_id", pa.string())]
+    for name, type_name in COLLECTION_SCHEMAS[collection_name]:
+        fields.append(pa.field(name, arrow_type(pa, type_name)))
+    return pa.schema(fields)
+
+def convert_value(value, type_name):
+    """Convert a Firestore value to the column type, or None if it does not fit."""
+    if value is None:
+        return None
+    try:
+        if type_name == "string":
+            return value if isinstance(value, str) else str(value)
+        if type_name == "double":
+            return float(value)
+        if type_name == "int64":
+            return int(value)
+        if type_name == "bool":
+            return bool(value)
+        if type_name == "timestamp":
+            return to_utc(value)
+        if type_name == "string_list":
+            return [str(item) for item in value]
+        if type_name == "int_map":
+            return [(str(key), int(count)) for key, count in value.items()]
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return None
+
+def export_partition(pa, query, schema, collection_name, output_path, batch_size, compression):
+    """Stream one partition into Arrow record batches and a Parquet file."""
+    fields = COLLECTION_SCHEMAS[collection_name]
+    columns = {name: [] for name in schema.names}
+    writer = None
+    rows = 0
+
+    def flush():
+        nonlocal writer
+        batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+        if writer is None:
+            writer = pa.parquet.ParquetWriter(output_path, schema, compression=compression)
+        writer.write_batch(batch)
+        for values in columns.values():
+            values.clear()
+
+    try:
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            columns["_id"].append(doc.id)
+            for name, type_name in fields:
+                columns[name].append(convert_value(data.get(name), type_name))
+            rows += 1
+
+            if len(columns["_id"]) >= batch_size:
+                flush()
+
+        if columns["_id"]:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
+
+def export_collection(db, pa, collection_name, output_dir, partition_count, executor, batch_size, compression):
+    """Export every document of a collection group, one Parquet file per partition."""
+    schema = build_schema(pa, collection_name)
+    collection_dir = os.path.join(output_dir, collection_name)
+    os.makedirs(collection_dir, exist_ok=True)
+
+    # Split the collection into ranges that can be read independently
+    partitions = list(db.collection_group(collection_name).get_partitions(partition_count))
+    print(f"Exporting {collection_name} in {len(partitions)} partitions...")
+
+    futures = []
+    for index, partition in enumerate(partitions):
+        output_path = os.path.join(collection_dir, f"part-{index:05d}.parquet")
+        futures.append(executor.submit(export_partition, pa, partition.query(), schema,
+                                       collection_name, output_path, batch_size, compression))
+
+    total = 0
+    for future in as_completed(futures):
+        total += future.result()
+
+    print(f"Exported {total} documents from {collection_name}")
+    return total
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Export Firestore collections to Parquet for sales analytics.")
+    parser.add_argument("--collections", nargs="+", default=list(COLLECTION_SCHEMAS),
+                        choices=list(COLLECTION_SCHEMAS), help="collections to export (default: all)")
+    parser.add_argument("--output-dir", default="exports", help="directory for the Parquet files")
+    parser.add_argument("--partitions", type=int, default=(os.cpu_count() or 4) * 2,
+                        help="number of query partitions per collection")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="partitions read concurrently")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per Arrow record batch")
+    parser.add_argument("--compression", default="zstd", help="Parquet compression codec")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting Firestore to Parquet export...")
+
+    pa = import_pyarrow()
+    if not pa:
+        return
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for collection_name in args.collections:
+            export_collection(db, pa, collection_name, args.output_dir, args.partitions,
+                              executor, args.batch_size, args.compression)
+
+    print(f"Export completed. Files written to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
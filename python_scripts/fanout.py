@@ -0,0 +1,133 @@
+import time
+import queue
+import threading
+
+from firebase_common import BATCH_SIZE, initialize_target_client, delete_in_batches
+from diff_sync import FIXTURE_COLLECTIONS
+
+# Batches waiting per target before its feeder pauses
+DEFAULT_QUEUE_DEPTH = 8
+
+# Batch commits in flight per target
+DEFAULT_TARGET_WORKERS = 4
+
+class TargetWriter:
+    """Feed one target from the shared batches through its own bounded queue."""
+
+    def __init__(self, name, db, queue_depth=DEFAULT_QUEUE_DEPTH, workers=DEFAULT_TARGET_WORKERS, prepare=None):
+        self.name = name
+        self.db = db
+        self.queue = queue.Queue(maxsize=queue_depth)
+        self.workers = workers
+        self.prepare = prepare
+        self.lock = threading.Lock()
+        self.written = 0
+        self.error = None
+        self.started = self.finished = 0.0
+        self.threads = []
+
+    def start(self, batches):
+        """Start the feeder and committer threads."""
+        self.started = time.perf_counter()
+        self.threads = [threading.Thread(target=self.feed, args=(batches,), daemon=True)]
+        self.threads += [threading.Thread(target=self.commit_loop, daemon=True) for _ in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def feed(self, batches):
+        """Prepare the target, then queue every batch; blocks only on this target's own queue."""
+        try:
+            if self.prepare:
+                self.prepare(self.db)
+            for batch in batches:
+                if self.error:
+                    break
+                self.queue.put(batch)
+        except Exception as e:
+            self.fail(e)
+        finally:
+            for _ in range(self.workers):
+                self.queue.put(None)
+
+    def commit_loop(self):
+        """Commit queued batches until the feeder signals the end."""
+        while True:
+            documents = self.queue.get()
+            if documents is None:
+                with self.lock:
+                    self.finished = max(self.finished, time.perf_counter())
+                break
+            # After a failure the rest of the queue is drained without writing
+            if self.error:
+                continue
+            try:
+                batch = self.db.batch()
+                for path, data in documents:
+                    batch.set(self.db.document(path), data)
+                batch.commit()
+                with self.lock:
+                    self.written += len(documents)
+            except Exception as e:
+                self.fail(e)
+
+    def fail(self, error):
+        with self.lock:
+            if not self.error:
+                self.error = error
+                print(f"[{self.name}] failed: {error}")
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    @property
+    def seconds(self):
+        return self.finished - self.started
+
+def open_targets(specs):
+    """Create one Firestore client per target spec, or None if any fails."""
+    clients = {}
+    for spec in specs:
+        client = initialize_target_client(spec)
+        if not client:
+            return None
+        clients[spec] = client
+    return clients
+
+def clear_target(db, collection_names=FIXTURE_COLLECTIONS):
+    """Delete every document of the seeded collections, messages first, in batches."""
+    refs = (doc.reference for doc in db.collection_group('messages').select([]).stream())
+    print(f"Cleared {delete_in_batches(db, refs)} messages")
+    for collection_name in collection_names:
+        refs = (doc.reference for doc in db.collection(collection_name).select([]).stream())
+        print(f"Cleared {delete_in_batches(db, refs)} documents from {collection_name}")
+
+def fan_out(clients, documents, prepare=None, batch_size=BATCH_SIZE,
+            queue_depth=DEFAULT_QUEUE_DEPTH, workers=DEFAULT_TARGET_WORKERS):
+    """Write one generated document stream to every target concurrently."""
+    # Documents are generated and grouped into batches once; every target reads the same list,
+    # so a slow or still-clearing target only holds back its own feeder
+    batches = []
+    current = []
+    for path, data in documents:
+        current.append((path, data))
+        if len(current) == batch_size:
+            batches.append(current)
+            current = []
+    if current:
+        batches.append(current)
+    total = sum(len(batch) for batch in batches)
+    print(f"Writing {total} documents to {len(clients)} targets in {len(batches)} batches")
+
+    writers = [TargetWriter(name, db, queue_depth, workers, prepare) for name, db in clients.items()]
+    for writer in writers:
+        writer.start(batches)
+    for writer in writers:
+        writer.join()
+
+    print(f"\n{'target':<40} {'written':>9} {'seconds':>9} {'docs/s':>9}  status")
+    for writer in writers:
+        rate = writer.written / writer.seconds if writer.seconds else 0.0
+        status = f"failed: {writer.error}" if writer.error else "ok"
+        print(f"{writer.name:<40} {writer.written:>9} {writer.seconds:>9.2f} {rate:>9.1f}  {status}")
+    return writers
@@ -0,0 +1,185 @@
+import os
+import json
+import datetime
+
+# Service account key shipped next to the scripts
+CREDENTIALS_FILENAME = "secondhand-marketplace-app-firebase-adminsdk-fbsvc-8c45231694.json"
+
+# Firestore allows at most 500 writes in a single batch
+BATCH_SIZE = 500
+
+# Firestore client shared by every command in this process
+_db = None
+
+def initialize_firebase():
+    """Initialize Firebase Admin SDK once and return the shared Firestore client."""
+    global _db
+    if _db is not None:
+        return _db
+
+    # Check if the credentials file exists
+    cred_path = get_credentials_path()
+    print(f"Looking for Firebase credentials at: {cred_path}")
+
+    if not os.path.exists(cred_path):
+        print(f"Error: Firebase credentials file not found at {cred_path}")
+        print("Please download your Firebase service account key and save it as specified")
+        print("Instructions: https://firebase.google.com/docs/admin/setup#initialize-sdk")
+        return None
+
+    try:
+        # Imported here so commands that never talk to Firebase start quickly
+        import firebase_admin
+        from firebase_admin import credentials
+        from firebase_admin import firestore
+
+        # Check if Firebase is already initialized
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(cred_path)
+            firebase_admin.initialize_app(cred)
+
+        # One client keeps one gRPC channel open for the whole run
+        _db = firestore.client()
+        print("Firebase initialized successfully")
+        return _db
+    except Exception as e:
+        print(f"Error initializing Firebase: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def get_credentials_path():
+    """Return the path of the service account key next to the scripts."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, CREDENTIALS_FILENAME)
+
+def get_project_id():
+    """Read the project ID from the service account key."""
+    with open(get_credentials_path(), encoding="utf-8") as f:
+        return json.load(f)["project_id"]
+
+def initialize_async_client(emulator_host=None, project_id=None):
+    """Create an asyncio Firestore client, optionally pointed at the emulator."""
+    try:
+        from google.cloud import firestore as cloud_firestore
+
+        if emulator_host:
+            # The client library switches to the emulator when this is set
+            os.environ["FIRESTORE_EMULATOR_HOST"] = emulator_host
+            client = cloud_firestore.AsyncClient(project=project_id or get_project_id())
+        else:
+            from google.oauth2 import service_account
+            cred = service_account.Credentials.from_service_account_file(get_credentials_path())
+            client = cloud_firestore.AsyncClient(project=project_id or cred.project_id, credentials=cred)
+
+        print(f"Async Firestore client ready{' (emulator at ' + emulator_host + ')' if emulator_host else ''}")
+        return client
+    except Exception as e:
+        print(f"Error initializing async Firestore client: {e}")
+        return None
+
+def initialize_target_client(spec):
+    """Create a Firestore client for a target spec: default, emulator:HOST:PORT[@project] or a key file path."""
+    if spec == "default":
+        return initialize_firebase()
+
+    try:
+        from google.cloud import firestore as cloud_firestore
+
+        if spec.startswith("emulator:"):
+            from google.auth.credentials import AnonymousCredentials
+
+            host, _, project_id = spec[len("emulator:"):].partition("@")
+            # Clients read the emulator host when they are created, so several can coexist
+            previous = os.environ.get("FIRESTORE_EMULATOR_HOST")
+            os.environ["FIRESTORE_EMULATOR_HOST"] = host
+            try:
+                client = cloud_firestore.Client(project=project_id or get_project_id(),
+                                                credentials=AnonymousCredentials())
+            finally:
+                if previous is None:
+                    del os.environ["FIRESTORE_EMULATOR_HOST"]
+                else:
+                    os.environ["FIRESTORE_EMULATOR_HOST"] = previous
+            return client
+
+        from google.oauth2 import service_account
+        cred = service_account.Credentials.from_service_account_file(spec)
+        return cloud_firestore.Client(project=cred.project_id, credentials=cred)
+    except Exception as e:
+        print(f"Error initializing Firestore client for {spec}: {e}")
+        return None
+
+def commit_in_batches(db, writes, batch_size=BATCH_SIZE, merge=False):
+    """Commit (document reference, data) pairs with batched writes."""
+    if not db:
+        return 0
+
+    batch = db.batch()
+    pending = 0
+    written = 0
+
+    for doc_ref, data in writes:
+        batch.set(doc_ref, data, merge=merge)
+        pending += 1
+
+        # Commit once the batch is full and start a new one
+        if pending == batch_size:
+            batch.commit()
+            written += pending
+            print(f"Committed {written} documents")
+            batch = db.batch()
+            pending = 0
+
+    # Commit any remaining writes
+    if pending:
+        batch.commit()
+        written += pending
+        print(f"Committed {written} documents")
+
+    return written
+
+def delete_in_batches(db, doc_refs, batch_size=BATCH_SIZE):
+    """Delete document references with batched writes."""
+    if not db:
+        return 0
+
+    batch = db.batch()
+    pending = 0
+    deleted = 0
+
+    for doc_ref in doc_refs:
+        batch.delete(doc_ref)
+        pending += 1
+
+        # Commit once the batch is full and start a new one
+        if pending == batch_size:
+            batch.commit()
+            deleted += pending
+            print(f"Deleted {deleted} documents")
+            batch = db.batch()
+            pending = 0
+
+    # Commit any remaining deletes
+    if pending:
+        batch.commit()
+        deleted += pending
+        print(f"Deleted {deleted} documents")
+
+    return deleted
+
+def to_utc(value):
+    """Return a timestamp as a UTC-aware datetime, or None if it is not one."""
+    if not isinstance(value, datetime.datetime):
+        return None
+    # Generated data is naive local time, Firestore returns UTC-aware values
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(datetime.timezone.utc)
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
@@ -0,0 +1,212 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+
+from firebase_common import initialize_async_client, percentile
+
+# Query mix per role, as relative weights of the query shapes the app issues
+ROLE_QUERY_MIX = {
+    "buyer": {
+        "category_browse": 25, "featured": 20, "recent": 15,
+        "product_reviews": 20, "inbox": 10, "buyer_orders": 10
+    },
+    "seller": {
+        "seller_listings": 30, "inbox": 30, "seller_orders": 25, "seller_reviews": 15
+    },
+    "admin": {
+        "admin_orders": 30, "admin_reports": 30, "admin_users": 20, "inbox": 20
+    }
+}
+
+# Share of simulated users per role
+DEFAULT_ROLE_SHARES = {"buyer": 0.75, "seller": 0.2, "admin": 0.05}
+
+async def load_dataset(db):
+    """Load the IDs the simulated users pick from with projected queries."""
+    users_by_role = defaultdict(list)
+    async for doc in db.collection('users').select(['role']).stream():
+        users_by_role[(doc.to_dict() or {}).get('role', 'buyer')].append(doc.id)
+
+    product_ids = []
+    categories = set()
+    async for doc in db.collection('products').select(['category']).stream():
+        product_ids.append(doc.id)
+        category = (doc.to_dict() or {}).get('category')
+        if category:
+            categories.add(category)
+
+    return {"users": users_by_role, "products": product_ids, "categories": sorted(categories)}
+
+def build_query(db, query_type, user_id, dataset):
+    """Build the Firestore query for one query shape, mirroring the app pages."""
+    if query_type == "category_browse":
+        return db.collection('products').where('category', '==', random.choice(dataset["categories"]))
+    if query_type == "featured":
+        return db.collection('products').order_by('adBoost', direction='DESCENDING').limit(10)
+    if query_type == "recent":
+        return db.collection('products').order_by('listedDate', direction='DESCENDING').limit(5)
+    if query_type == "product_reviews":
+        return db.collection('reviews').where('productId', '==', random.choice(dataset["products"]))
+    if query_type == "inbox":
+        return (db.collection('chats')
+                .where('participants', 'array_contains', user_id)
+                .order_by('lastMessageTimestamp', direction='DESCENDING'))
+    if query_type == "buyer_orders":
+        return db.collection('orders').where('buyerId', '==', user_id)
+    if query_type == "seller_orders":
+        return db.collection('orders').where('sellerId', '==', user_id)
+    if query_type == "seller_listings":
+        return (db.collection('products')
+                .where('sellerId', '==', user_id)
+                .order_by('listedDate', direction='DESCENDING'))
+    if query_type == "seller_reviews":
+        return db.collection('reviews').where('sellerId', '==', user_id)
+    if query_type == "admin_orders":
+        return db.collection('orders').order_by('purchaseDate', direction='DESCENDING')
+    if query_type == "admin_reports":
+        return db.collection('reports').order_by('timestamp', direction='DESCENDING')
+    if query_type == "admin_users":
+        return db.collection('users').order_by('username')
+    raise ValueError(f"Unknown query type: {query_type}")
+
+class Pacer:
+    """Spread requests from all simulated users evenly to hit a target QPS."""
+
+    def __init__(self, qps):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self.next_slot = time.perf_counter()
+
+    async def wait(self):
+        """Wait for the next free request slot."""
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+async def simulate_user(db, role, user_id, dataset, pacer, deadline, think_time, latencies, errors):
+    """Issue the role's query mix until the deadline, with think time between requests."""
+    mix = ROLE_QUERY_MIX[role]
+    query_types = list(mix)
+    weights = list(mix.values())
+
+    while time.perf_counter() < deadline:
+        query_type = random.choices(query_types, weights=weights, k=1)[0]
+        await pacer.wait()
+
+        start = time.perf_counter()
+        try:
+            await build_query(db, query_type, user_id, dataset).get()
+            latencies[query_type].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors[query_type] += 1
+            if errors[query_type] == 1:
+                print(f"First error for {query_type}: {e}")
+
+        # Exponential think time around the configured mean
+        if think_time > 0:
+            await asyncio.sleep(random.expovariate(1.0 / think_time))
+
+def summarize(latencies, errors, elapsed):
+    """Build per-query-type latency percentiles."""
+    summary = {}
+    for query_type in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies[query_type])
+        summary[query_type] = {
+            "count": len(values),
+            "errors": errors[query_type],
+            "qps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(values, 0.50), 1),
+            "p90_ms": round(percentile(values, 0.90), 1),
+            "p99_ms": round(percentile(values, 0.99), 1),
+            "max_ms": round(values[-1], 1) if values else 0.0
+        }
+    return summary
+
+def assign_users(dataset, num_users, role_shares):
+    """Pick (role, user ID) pairs for the simulated users from the seeded data."""
+    simulated = []
+    for role, share in role_shares.items():
+        candidates = dataset["users"].get(role, [])
+        if not candidates or share <= 0:
+            continue
+        for _ in range(max(1, round(num_users * share))):
+            simulated.append((role, random.choice(candidates)))
+    return simulated[:num_users] if len(simulated) > num_users else simulated
+
+async def run_load_test(db, num_users, qps, duration, think_time, role_shares):
+    """Run simulated buyers, sellers and admins against the database."""
+    print("Loading dataset IDs...")
+    dataset = await load_dataset(db)
+    if not dataset["products"] or not dataset["categories"]:
+        print("No products found. Seed the database with populate_firebase_data.py first.")
+        return None
+
+    simulated = assign_users(dataset, num_users, role_shares)
+    if not simulated:
+        print("No users found. Seed the database with populate_firebase_data.py first.")
+        return None
+    print(f"Simulating {len(simulated)} users at up to {qps} QPS for {duration} seconds...")
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    pacer = Pacer(qps)
+    start = time.perf_counter()
+    deadline = start + duration
+
+    await asyncio.gather(*(
+        simulate_user(db, role, user_id, dataset, pacer, deadline, think_time, latencies, errors)
+        for role, user_id in simulated
+    ))
+
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+def print_summary(summary):
+    """Print the latency table."""
+    print(f"\n{'query':<18} {'count':>7} {'errors':>6} {'qps':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for query_type, stats in summary.items():
+        print(f"{query_type:<18} {stats['count']:>7} {stats['errors']:>6} {stats['qps']:>7} "
+              f"{stats['p50_ms']:>8} {stats['p90_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Replay buyer, seller and admin query mixes against Firestore.")
+    parser.add_argument("--emulator-host", default="localhost:8080",
+                        help="Firestore emulator host, or an empty string for the real project")
+    parser.add_argument("--users", type=int, default=50, help="number of simulated users")
+    parser.add_argument("--qps", type=float, default=100.0, help="target queries per second across all users")
+    parser.add_argument("--duration", type=float, default=60.0, help="test length in seconds")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds between a user's requests")
+    parser.add_argument("--buyer-share", type=float, default=DEFAULT_ROLE_SHARES["buyer"])
+    parser.add_argument("--seller-share", type=float, default=DEFAULT_ROLE_SHARES["seller"])
+    parser.add_argument("--admin-share", type=float, default=DEFAULT_ROLE_SHARES["admin"])
+    parser.add_argument("--output", help="write the latency summary to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting Firestore load test...")
+
+    db = initialize_async_client(args.emulator_host or None)
+    if not db:
+        print("Failed to initialize Firestore. Exiting.")
+        return
+
+    role_shares = {"buyer": args.buyer_share, "seller": args.seller_share, "admin": args.admin_share}
+    summary = asyncio.run(run_load_test(db, args.users, args.qps, args.duration, args.think_time, role_shares))
+    if not summary:
+        return
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSummary written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import importlib
+
+# Subcommand -> (module, entry function, description)
+# Modules are imported only when their subcommand runs, so each command pays
+# for its own dependencies (Faker, firebase_admin, ...) and nothing else.
+COMMANDS = {
+    "populate": ("populate_firebase_data", "main", "Populate Firestore with sample marketplace data"),
+    "clear": ("clear_firebase_data", "main", "Delete all Firestore data and Auth accounts"),
+    "create-auth-accounts": ("create_auth_accounts", "main", "Create Auth accounts for every users doc"),
+    "create-buyer": ("create_buyer", "create_buyer", "Interactively create one buyer account"),
+    "create-seller": ("create_seller", "create_seller", "Interactively create one seller account"),
+    "create-admin": ("create_admin", "create_admin", "Interactively create one admin account"),
+    "bulk-create-accounts": ("bulk_create_accounts", "main", "Create accounts from a CSV or JSONL file"),
+    "export": ("export_parquet", "main", "Export collections to Parquet files for analytics"),
+    "sales-rollup": ("sales_rollup", "main", "Materialize per-seller daily sales rollups"),
+    "aggregate-worker": ("aggregate_worker", "main", "Keep derived fields fresh from live changes"),
+    "load-test": ("load_test", "main", "Replay app query mixes and report latency percentiles"),
+    "bench-checkout": ("bench_checkout", "main", "Benchmark concurrent checkout transactions on hot products"),
+    "sharded-counters": ("sharded_counters", "main", "Migrate, compact and read sharded counters"),
+    "listings": ("materialized_listings", "main", "Materialize featured and per-category top-K listings"),
+    "inboxes": ("user_inboxes", "main", "Build per-user inbox documents for chat lists"),
+    "cascade-delete": ("cascade_delete", "main", "Delete users or products with all their dependents"),
+    "archive": ("cold_archive", "main", "Archive or restore old messages and wallet transactions"),
+    "validate": ("validate_integrity", "main", "Report references that point at missing documents"),
+    "bench-records": ("bench_records", "main", "Compare memory of dict and columnar message records"),
+    "bench-generators": ("bench_generators", "main", "Benchmark the data generators at geometric scales"),
+    "settle-orders": ("settle_orders", "main", "Advance orders a status step in bulk and post ledger entries"),
+    "enrich-chats": ("enrich_chats", "main", "Denormalize participant names and product details into chats"),
+    "auth-sync": ("auth_sync", "main", "Create, update or delete only the Auth accounts that differ from users"),
+    "emulator-export": ("emulator_export", "main", "Build a cached emulator export for pre-seeded test runs"),
+    "admin-metrics": ("admin_metrics", "main", "Compute admin dashboard metrics into one stats doc"),
+}
+
+def load_command(name):
+    """Import the module behind a subcommand and return its entry function."""
+    module_name, function_name, _ = COMMANDS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+def print_usage():
+    """Print the list of available subcommands."""
+    print("usage: marketplace_cli.py <command> [options]\n")
+    print("commands:")
+    for name, (_, _, description) in COMMANDS.items():
+        print(f"  {name:<22} {description}")
+    print("\nRun 'marketplace_cli.py <command> --help' for command options.")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+
+    name = argv[0]
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n")
+        print_usage()
+        return 2
+
+    entry = load_command(name)
+
+    # The scripts parse sys.argv themselves, so hand them only their own options
+    sys.argv = [f"marketplace_cli.py {name}"] + argv[1:]
+    entry()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import time
+import heapq
+import argparse
+import datetime
+import threading
+
+from firebase_common import initialize_firebase, commit_in_batches, to_utc
+
+# Collection holding one document per materialized listing
+LISTINGS_COLLECTION = "featuredListings"
+
+# Products shown per listing
+DEFAULT_TOP_K = 50
+
+# Product fields copied into listing items, matching Product.fromFirestore minus the description
+ITEM_FIELDS = ['name', 'price', 'imageUrl', 'category', 'sellerId', 'condition',
+               'listedDate', 'stock', 'adBoost', 'minBargainPrice']
+
+# Uploaded images are stored inline as base64 data URIs. Longer ones are left
+# out of listing items so a listing stays far below the 1 MiB document limit.
+MAX_INLINE_IMAGE_LENGTH = 2048
+
+# Sort keys of the two orderings the app uses
+ORDERINGS = ("adBoost", "recent")
+
+def listing_id(ordering, category=None):
+    """Return the document ID of a listing, global when category is None."""
+    return f"{category}_{ordering}" if category else f"global_{ordering}"
+
+def product_item(doc_id, data):
+    """Build the compact listing item for a product."""
+    item = {"id": doc_id}
+    for field in ITEM_FIELDS:
+        item[field] = data.get(field)
+
+    image_url = item.get("imageUrl")
+    if isinstance(image_url, str) and len(image_url) > MAX_INLINE_IMAGE_LENGTH:
+        item["imageUrl"] = None
+    return item
+
+def sort_key(item, ordering):
+    """Return the heap key of an item; larger keys rank first."""
+    listed = to_utc(item.get("listedDate"))
+    listed_ts = listed.timestamp() if listed else 0.0
+    ad_boost = float(item.get("adBoost") or 0)
+    if ordering == "adBoost":
+        return (ad_boost, listed_ts, item["id"])
+    return (listed_ts, ad_boost, item["id"])
+
+def push_bounded(heap, key, item, k):
+    """Keep the k largest keys in a min-heap."""
+    if len(heap) < k:
+        heapq.heappush(heap, (key, item))
+    elif key > heap[0][0]:
+        heapq.heapreplace(heap, (key, item))
+
+def listings_for(item):
+    """Return the listing IDs a product belongs to."""
+    ids = [listing_id(ordering) for ordering in ORDERINGS]
+    if item.get("category"):
+        ids += [listing_id(ordering, item["category"]) for ordering in ORDERINGS]
+    return ids
+
+def build_listings(docs, k=DEFAULT_TOP_K):
+    """Stream products once and keep bounded heaps for every listing."""
+    heaps = {}
+    scanned = 0
+    for doc in docs:
+        item = product_item(doc.id, doc.to_dict() or {})
+        for ordering in ORDERINGS:
+            key = sort_key(item, ordering)
+            push_bounded(heaps.setdefault(listing_id(ordering), []), key, item, k)
+            if item.get("category"):
+                push_bounded(heaps.setdefault(listing_id(ordering, item["category"]), []), key, item, k)
+        scanned += 1
+
+    print(f"Scanned {scanned} products into {len(heaps)} listings")
+    return {doc_id: [item for _, item in sorted(heap, key=lambda entry: entry[0], reverse=True)]
+            for doc_id, heap in heaps.items()}
+
+def listing_doc(doc_id, items, updated_at):
+    """Build the listing document stored in Firestore."""
+    scope, _, ordering = doc_id.rpartition("_")
+    return {
+        "ordering": ordering,
+        "category": None if scope == "global" else scope,
+        "items": items,
+        "size": len(items),
+        "updatedAt": updated_at
+    }
+
+def write_listings(db, listings):
+    """Write listing documents in batches."""
+    collection = db.collection(LISTINGS_COLLECTION)
+    updated_at = datetime.datetime.now(datetime.timezone.utc)
+    writes = ((collection.document(doc_id), listing_doc(doc_id, items, updated_at))
+              for doc_id, items in listings.items())
+    return commit_in_batches(db, writes)
+
+def rebuild(db, k=DEFAULT_TOP_K):
+    """Rebuild every listing from one pass over products."""
+    docs = db.collection('products').select(ITEM_FIELDS).stream()
+    listings = build_listings(docs, k)
+    written = write_listings(db, listings)
+    print(f"Wrote {written} listing documents to {LISTINGS_COLLECTION}")
+    return listings
+
+class ListingsWatcher:
+    """Refresh only the listings a product change can affect."""
+
+    def __init__(self, db, k=DEFAULT_TOP_K):
+        self.db = db
+        self.k = k
+        self.lock = threading.Lock()
+        self.items = {}  # productId -> compact item
+        self.listings = {}  # listing ID -> current item IDs
+        self.thresholds = {}  # listing ID -> key of the last item when full
+        self.dirty = set()
+        self.initialized = False
+        self.watch = None
+
+    def start(self):
+        """Subscribe to products."""
+        self.watch = self.db.collection('products').on_snapshot(self.on_snapshot)
+
+    def stop(self):
+        """Unsubscribe from products."""
+        if self.watch:
+            self.watch.unsubscribe()
+            self.watch = None
+
+    def could_affect(self, listing, ordering, old_item, new_item):
+        """Return True if a change can alter the listing's contents or order."""
+        if old_item and old_item["id"] in self.listings.get(listing, ()):
+            return True
+        if new_item is None:
+            return False
+        threshold = self.thresholds.get(listing)
+        return threshold is None or sort_key(new_item, ordering) > threshold
+
+    def on_snapshot(self, doc_snapshots, changes, read_time):
+        """Update the product index and mark affected listings dirty."""
+        with self.lock:
+            for change in changes:
+                doc = change.document
+                old_item = self.items.pop(doc.id, None)
+                new_item = None if change.type.name == "REMOVED" else product_item(doc.id, doc.to_dict() or {})
+                if new_item:
+                    self.items[doc.id] = new_item
+                if not self.initialized:
+                    continue
+
+                for item in (old_item, new_item):
+                    if not item:
+                        continue
+                    for listing in listings_for(item):
+                        ordering = listing.rpartition("_")[2]
+                        if self.could_affect(listing, ordering, old_item, new_item):
+                            self.dirty.add(listing)
+
+            # The initial snapshot rebuilds everything once
+            if not self.initialized:
+                self.dirty = {listing for item in self.items.values() for listing in listings_for(item)}
+                self.initialized = True
+
+    def flush(self):
+        """Recompute dirty listings from the in-memory index and write them."""
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            listings = {}
+            for listing in dirty:
+                scope, _, ordering = listing.rpartition("_")
+                candidates = (item for item in self.items.values()
+                              if scope == "global" or item.get("category") == scope)
+                top = heapq.nlargest(self.k, candidates, key=lambda item: sort_key(item, ordering))
+                listings[listing] = top
+                self.listings[listing] = {item["id"] for item in top}
+                self.thresholds[listing] = sort_key(top[-1], ordering) if len(top) == self.k else None
+
+        if not listings:
+            return 0
+        written = write_listings(self.db, listings)
+        print(f"Refreshed {written} listings")
+        return written
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Materialize featured and per-category top-K product listings.")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="products per listing")
+    parser.add_argument("--watch", action="store_true", help="keep listings fresh as products change")
+    parser.add_argument("--flush-interval", type=float, default=10.0, help="seconds between refreshes in watch mode")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting listing materialization...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    if not args.watch:
+        rebuild(db, args.top_k)
+        return
+
+    watcher = ListingsWatcher(db, args.top_k)
+    watcher.start()
+    print(f"Watching products, refreshing every {args.flush_interval} seconds. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(args.flush_interval)
+            watcher.flush()
+    except KeyboardInterrupt:
+        print("\nStopping watcher...")
+    finally:
+        watcher.stop()
+        watcher.flush()
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,90 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
 import os
 import json
 import random
-import uuid
+import argparse
+import itertools
 import datetime
-from faker import Faker
-from dateutil.relativedelta import relativedelta
 
-# Initialize Faker for generating realistic data
-fake = Faker()
+from firebase_common import initialize_firebase, commit_in_batches
+from profiling import PhaseProfiler, add_profiling_args
+from compact_records import MessageColumns, message_writes
+from diff_sync import sync_fixture, fixture_documents, DEFAULT_MANIFEST
+from fanout import open_targets, fan_out, clear_target, DEFAULT_QUEUE_DEPTH
+from distributions import chooser, power_law_int
 
 # Base64 encoded default images
 NO_IMAGE_AVAILABLE_URL = "https://upload.wikimedia.org/wikipedia/commons/1/14/No_Image_Available.jpg"
 NO_PFP_URL = "https://i.pinimg.com/1200x/2c/47/d5/2c47d5dd5b532f83bb55c4cd6f5bd1ef.jpg"
 
-def initialize_firebase():
-    """Initialize Firebase Admin SDK with service account credentials."""
-    # Check if the credentials file exists
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    cred_path = os.path.join(script_dir, "secondhand-marketplace-app-firebase-adminsdk-fbsvc-8c45231694.json")
-    print(f"Looking for Firebase credentials at: {cred_path}")
-    
-    if not os.path.exists(cred_path):
-        print(f"Error: Firebase credentials file not found at {cred_path}")
-        print("Please download your Firebase service account key and save it as specified")
-        print("Instructions: https://firebase.google.com/docs/admin/setup#initialize-sdk")
-        return None
-    
-    try:
-        # Check if Firebase is already initialized
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        print("Firebase initialized successfully")
-        return db
-    except Exception as e:
-        print(f"Error initializing Firebase: {e}")
-        return None
+# Faker is slow to import, so it is created on first use
+_fake = None
+
+def get_faker():
+    """Return the shared Faker instance for generating realistic data."""
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        _fake = Faker()
+    return _fake
+
+# Reference time of generated data, pinned by set_seed() so reruns repeat it
+_now = None
+
+# Reference date of seeded runs, fixed so reruns on any day generate identical documents
+DEFAULT_AS_OF = datetime.date(2025, 1, 1)
+
+def current_time():
+    """Return the time generated dates are relative to."""
+    return _now or datetime.datetime.now()
+
+def short_id():
+    """Return an 8 hex digit ID suffix drawn from the seedable random module."""
+    return f"{random.getrandbits(32):08x}"
+
+def set_seed(seed, as_of=None):
+    """Make generation repeatable by seeding random and Faker and pinning the reference time."""
+    global _now
+    random.seed(seed)
+    get_faker().seed_instance(seed)
+    _now = datetime.datetime.combine(as_of or DEFAULT_AS_OF, datetime.time())
+
+# Zipf exponents by distribution: seller, demand, chat_length, activity. Missing means uniform.
+_skew = {}
+
+# Exponents used by --skew
+DEFAULT_SKEW = {"seller": 1.1, "demand": 1.2, "chat_length": 1.5, "activity": 1.0}
+
+def set_skew(**exponents):
+    """Switch generators from uniform to Zipf-skewed picks for the given distributions."""
+    _skew.clear()
+    _skew.update({name: exponent for name, exponent in exponents.items() if exponent})
+
+def skewed_choice(items, distribution):
+    """Return a picker over items that follows the configured skew of a distribution."""
+    return chooser(items, _skew.get(distribution, 0))
+
+def select_products(products, count):
+    """Pick products for orders, chats or reports, repeating popular ones when demand is skewed."""
+    exponent = _skew.get("demand")
+    if not exponent:
+        return random.sample(products, min(count, len(products)))
+    pick = chooser(products, exponent)
+    return [pick() for _ in range(count)]
+
+def choose_other(user_ids, excluded, pick=None):
+    """Pick a random user ID other than excluded."""
+    pick = pick or (lambda: random.choice(user_ids))
+    # Retrying keeps each pick O(1); copying the list without the seller made generation quadratic
+    for _ in range(8):
+        user_id = pick()
+        if user_id != excluded:
+            return user_id
+    return random.choice([user_id for user_id in user_ids if user_id != excluded])
 
 # Data generation functions
 def generate_users(num_users=20):
     """Generate sample user data with roles (buyer, seller, admin)."""
+    fake = get_faker()
     users = []
     cities = ["Kuala Lumpur", "Johor Bahru", "Ipoh", "George Town", "Shah Alam", "Petaling Jaya", 
              "Kuching", "Kota Kinabalu", "Malacca City", "Alor Setar"]
@@ -67,7 +108,8 @@ def generate_users(num_users=20):
         uid = f"{role_prefix}_{i}"  # e.g., buyer_1, seller_1, admin_1
         username = fake.user_name()
         email = fake.email()
-        join_date = fake.date_time_between(start_date='-2y', end_date='now')
+        join_date = fake.date_time_between(start_date=current_time() - datetime.timedelta(days=730),
+                                           end_date=current_time())
         rating = round(random.uniform(3.0, 5.0), 1)
         wallet_balance = round(random.uniform(0, 1000), 2)
         
@@ -166,23 +208,26 @@ def generate_product_data(user_ids):
         ]
     }
     
+    # A few power sellers list most products when seller skew is set
+    pick_seller = skewed_choice(user_ids, "seller")
+    
     # Generate products for each category
     for category in categories:
         category_items = category_products[category]
         
         for item in category_items:
             # Generate a unique ID
-            product_id = f"{category}_{uuid.uuid4().hex[:8]}"
+            product_id = f"{category}_{short_id()}"
             
             # Random condition from the list
             condition = random.choice(conditions)
             
             # Randomly select a seller ID
-            seller_id = random.choice(user_ids)
+            seller_id = pick_seller()
             
             # Generate a random creation date within the last 90 days
             days_ago = random.randint(0, 90)
-            listed_date = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+            listed_date = current_time() - datetime.timedelta(days=days_ago)
             
             # Calculate minimum bargaining price (70-85% of original price)
             min_bargain_percentage = random.uniform(0.7, 0.85)
@@ -214,15 +259,15 @@ def generate_orders(products, user_ids, num_orders=40):
     status_options = ["Pending", "Processed", "Out For Delivery", "Received", "Cancelled"]
     
     # Select random products for orders
-    selected_products = random.sample(products, min(num_orders, len(products)))
+    selected_products = select_products(products, num_orders)
+    pick_buyer = skewed_choice(user_ids, "activity")
     
     for i, product in enumerate(selected_products):
         # Generate a unique ID
-        order_id = f"order_{uuid.uuid4().hex[:8]}"
+        order_id = f"order_{short_id()}"
         
         # Ensure buyer is not the seller
-        available_buyers = [uid for uid in user_ids if uid != product["sellerId"]]
-        buyer_id = random.choice(available_buyers)
+        buyer_id = choose_other(user_ids, product["sellerId"], pick_buyer)
         
         # Random quantity between 1 and 3
         quantity = random.randint(1, 3)
@@ -232,7 +277,8 @@ def generate_orders(products, user_ids, num_orders=40):
         
         # Final price might have a discount (0-15%)
         discount_percent = random.randint(0, 15)
-        price = round(original_price * (1 - discount_percent/100))
+        # Like the app's checkout, price is the total paid for all units
+        price = round(original_price * (1 - discount_percent/100)) * quantity
         
         # Random status
         status = random.choice(status_options)
@@ -243,7 +289,7 @@ def generate_orders(products, user_ids, num_orders=40):
         purchase_date = product_date + datetime.timedelta(days=days_after_listing)
         
         # Ensure purchase date is not in the future
-        now = datetime.datetime.now()
+        now = current_time()
         if purchase_date > now:
             purchase_date = now - datetime.timedelta(hours=random.randint(1, 24))
         
@@ -282,7 +328,7 @@ def generate_reviews(orders, num_reviews=30):
     
     for order in selected_orders:
         # Generate a unique ID
-        review_id = f"review_{uuid.uuid4().hex[:8]}"
+        review_id = f"review_{short_id()}"
         
         # Random rating between 1 and 5
         rating = random.randint(3, 5)  # Biased toward positive reviews
@@ -316,7 +362,7 @@ def generate_reviews(orders, num_reviews=30):
         review_date = purchase_date + datetime.timedelta(days=days_after_purchase)
         
         # Ensure review date is not in the future
-        now = datetime.datetime.now()
+        now = current_time()
         if review_date > now:
             review_date = now - datetime.timedelta(hours=random.randint(1, 24))
         
@@ -341,15 +387,15 @@ def generate_chats(products, user_ids, num_chats=25):
     chats = []
     
     # Select random products for chats
-    selected_products = random.sample(products, min(num_chats, len(products)))
+    selected_products = select_products(products, num_chats)
+    pick_buyer = skewed_choice(user_ids, "activity")
     
     for product in selected_products:
         # Generate a unique ID
-        chat_id = f"chat_{uuid.uuid4().hex[:8]}"
+        chat_id = f"chat_{short_id()}"
         
         # Ensure potential buyer is not the seller
-        available_buyers = [uid for uid in user_ids if uid != product["sellerId"]]
-        buyer_id = random.choice(available_buyers)
+        buyer_id = choose_other(user_ids, product["sellerId"], pick_buyer)
         
         # Participants are the buyer and seller
         participants = [buyer_id, product["sellerId"]]
@@ -369,7 +415,7 @@ def generate_chats(products, user_ids, num_chats=25):
         
         # Random timestamp within the last 30 days
         days_ago = random.randint(0, 30)
-        last_message_timestamp = datetime.datetime.now() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
+        last_message_timestamp = current_time() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
         
         # Random sender (buyer or seller)
         last_message_sender_id = random.choice(participants)
@@ -396,98 +442,116 @@ def generate_chats(products, user_ids, num_chats=25):
     
     return chats
 
-def generate_messages(chats, num_messages_per_chat=10):
-    """Generate sample message data for each chat."""
-    all_messages = []
-    
-    message_templates = [
-        "Hi, is this still available?",
-        "Yes, it's still available.",
-        "What's the lowest you can go?",
-        "I can do $PRICE.",
-        "Can I see more pictures?",
-        "Sure, I'll send some more pictures soon.",
-        "Where are you located?",
-        "I'm in CITY.",
-        "When can we meet?",
-        "How about tomorrow at 5pm?",
-        "That works for me.",
-        "Great, see you then!",
-        "Is the condition really as described?",
-        "Yes, it's in great condition.",
-        "Do you have the original packaging?",
-        "No, I don't have the original packaging anymore.",
-        "Can you deliver it?",
-        "Sorry, I can't deliver, but we can meet halfway.",
-        "I'll think about it and get back to you.",
-        "No problem, let me know if you have any other questions."
-    ]
+# Message texts used for generated chat history
+MESSAGE_TEMPLATES = [
+    "Hi, is this still available?",
+    "Yes, it's still available.",
+    "What's the lowest you can go?",
+    "I can do $PRICE.",
+    "Can I see more pictures?",
+    "Sure, I'll send some more pictures soon.",
+    "Where are you located?",
+    "I'm in CITY.",
+    "When can we meet?",
+    "How about tomorrow at 5pm?",
+    "That works for me.",
+    "Great, see you then!",
+    "Is the condition really as described?",
+    "Yes, it's in great condition.",
+    "Do you have the original packaging?",
+    "No, I don't have the original packaging anymore.",
+    "Can you deliver it?",
+    "Sorry, I can't deliver, but we can meet halfway.",
+    "I'll think about it and get back to you.",
+    "No problem, let me know if you have any other questions."
+]
+
+def generate_chat_messages(chat, num_messages_per_chat=10):
+    """Generate the message history of one chat in chronological order."""
+    chat_id = chat["id"]
+    participants = chat["participants"]
+    last_message = chat["lastMessage"]
+    last_timestamp = chat["lastMessageTimestamp"]
     
-    for chat in chats:
-        chat_id = chat["id"]
-        participants = chat["participants"]
-        last_message = chat["lastMessage"]
-        last_timestamp = chat["lastMessageTimestamp"]
-        
-        # Generate a random number of messages for this chat
+    # Generate a random number of messages for this chat
+    if _skew.get("chat_length"):
+        # Most chats stay short and a few run to the maximum
+        num_messages = power_law_int(3, num_messages_per_chat, _skew["chat_length"])
+    else:
         num_messages = random.randint(3, num_messages_per_chat)
+    
+    messages = []
+    
+    # Generate messages with timestamps going backwards from the last message
+    for i in range(num_messages):
+        message_id = f"message_{short_id()}"
         
-        messages = []
+        # Alternate sender
+        sender_id = participants[i % 2]
         
-        # Generate messages with timestamps going backwards from the last message
-        for i in range(num_messages):
-            message_id = f"message_{uuid.uuid4().hex[:8]}"
-            
-            # Alternate sender
-            sender_id = participants[i % 2]
-            
-            # For the last message, use the chat's last message and sender
-            if i == 0:
-                text = last_message
-                timestamp = last_timestamp
-                sender_id = chat["lastMessageSenderId"]
-            else:
-                # Random message text
-                text = random.choice(message_templates)
-                
-                # Replace placeholders if needed
-                if "$PRICE" in text:
-                    text = text.replace("$PRICE", f"${random.randint(50, 500)}")
-                if "CITY" in text:
-                    text = text.replace("CITY", random.choice(["New York", "Los Angeles", "Chicago", "Houston"]))
-                
-                # Timestamp is earlier than the previous message
-                minutes_before = random.randint(5, 60)
-                timestamp = messages[i-1]["timestamp"] - datetime.timedelta(minutes=minutes_before)
-            
-            # 10% chance of having an image
-            image_url = None
-            if random.random() < 0.1:
-                image_url = f"https://images.unsplash.com/photo-{random.randint(1500000000, 1600000000)}-{uuid.uuid4().hex[:8]}?w=300"
-            
-            # Determine if the message is read
-            is_read = True
-            if i == 0 and chat["unreadCount"].get(participants[1 - participants.index(sender_id)], 0) > 0:
-                is_read = False
+        # For the last message, use the chat's last message and sender
+        if i == 0:
+            text = last_message
+            timestamp = last_timestamp
+            sender_id = chat["lastMessageSenderId"]
+        else:
+            # Random message text
+            text = random.choice(MESSAGE_TEMPLATES)
             
-            message = {
-                "id": message_id,
-                "senderId": sender_id,
-                "text": text,
-                "timestamp": timestamp,
-                "isRead": is_read,
-                "imageUrl": image_url,
-                "chatId": chat_id  # Reference to parent chat
-            }
+            # Replace placeholders if needed
+            if "$PRICE" in text:
+                text = text.replace("$PRICE", f"${random.randint(50, 500)}")
+            if "CITY" in text:
+                text = text.replace("CITY", random.choice(["New York", "Los Angeles", "Chicago", "Houston"]))
             
-            messages.append(message)
+            # Timestamp is earlier than the previous message
+            minutes_before = random.randint(5, 60)
+            timestamp = messages[i-1]["timestamp"] - datetime.timedelta(minutes=minutes_before)
+        
+        # 10% chance of having an image
+        image_url = None
+        if random.random() < 0.1:
+            image_url = f"https://images.unsplash.com/photo-{random.randint(1500000000, 1600000000)}-{short_id()}?w=300"
+        
+        # Determine if the message is read
+        is_read = True
+        if i == 0 and chat["unreadCount"].get(participants[1 - participants.index(sender_id)], 0) > 0:
+            is_read = False
+        
+        message = {
+            "id": message_id,
+            "senderId": sender_id,
+            "text": text,
+            "timestamp": timestamp,
+            "isRead": is_read,
+            "imageUrl": image_url,
+            "chatId": chat_id  # Reference to parent chat
+        }
         
-        # Reverse the messages so they're in chronological order
-        messages.reverse()
-        all_messages.extend(messages)
+        messages.append(message)
+    
+    # Reverse the messages so they're in chronological order
+    messages.reverse()
+    return messages
+
+def generate_messages(chats, num_messages_per_chat=10):
+    """Generate sample message data for each chat."""
+    all_messages = []
+    
+    for chat in chats:
+        all_messages.extend(generate_chat_messages(chat, num_messages_per_chat))
     
     return all_messages
 
+def generate_message_columns(chats, num_messages_per_chat=10):
+    """Generate message data straight into compact columns, one chat at a time."""
+    columns = MessageColumns()
+    
+    for chat in chats:
+        columns.extend(generate_chat_messages(chat, num_messages_per_chat))
+    
+    return columns
+
 def generate_wallet_transactions(users, orders, num_extra_transactions=30):
     """Generate sample wallet transaction data."""
     transactions = []
@@ -497,7 +561,7 @@ def generate_wallet_transactions(users, orders, num_extra_transactions=30):
     for order in orders:
         if order["status"] in ["Processed", "Out For Delivery", "Received"]:
             # Create a purchase transaction for the buyer
-            buyer_transaction_id = f"transaction_{uuid.uuid4().hex[:8]}"
+            buyer_transaction_id = f"transaction_{short_id()}"
             buyer_transaction = {
                 "id": buyer_transaction_id,
                 "userId": order["buyerId"],
@@ -510,7 +574,7 @@ def generate_wallet_transactions(users, orders, num_extra_transactions=30):
             transactions.append(buyer_transaction)
             
             # Create a sale transaction for the seller
-            seller_transaction_id = f"transaction_{uuid.uuid4().hex[:8]}"
+            seller_transaction_id = f"transaction_{short_id()}"
             seller_transaction = {
                 "id": seller_transaction_id,
                 "userId": order["sellerId"],
@@ -524,7 +588,7 @@ def generate_wallet_transactions(users, orders, num_extra_transactions=30):
     
     # Generate additional random transactions
     for _ in range(num_extra_transactions):
-        transaction_id = f"transaction_{uuid.uuid4().hex[:8]}"
+        transaction_id = f"transaction_{short_id()}"
         user_id = random.choice(users)["uid"]
         transaction_type = random.choice(transaction_types)
         
@@ -546,7 +610,7 @@ def generate_wallet_transactions(users, orders, num_extra_transactions=30):
         
         # Random timestamp within the last 90 days
         days_ago = random.randint(0, 90)
-        timestamp = datetime.datetime.now() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
+        timestamp = current_time() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
         
         transaction = {
             "id": transaction_id,
@@ -576,14 +640,14 @@ def generate_reports(products, user_ids, num_reports=15):
     
     # Select random products for reports
     selected_products = random.sample(products, min(num_reports, len(products)))
+    pick_reporter = skewed_choice(user_ids, "activity")
     
     for product in selected_products:
         # Generate a unique ID
-        report_id = f"report_{uuid.uuid4().hex[:8]}"
+        report_id = f"report_{short_id()}"
         
         # Ensure reporter is not the seller
-        available_reporters = [uid for uid in user_ids if uid != product["sellerId"]]
-        reporter_id = random.choice(available_reporters)
+        reporter_id = choose_other(user_ids, product["sellerId"], pick_reporter)
         
         # Random reason and description
         reason = random.choice(report_reasons)
@@ -602,7 +666,7 @@ def generate_reports(products, user_ids, num_reports=15):
         
         # Random timestamp within the last 60 days
         days_ago = random.randint(0, 60)
-        timestamp = datetime.datetime.now() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
+        timestamp = current_time() - datetime.timedelta(days=days_ago, hours=random.randint(0, 23))
         
         # Random status, weighted toward pending and investigating for newer reports
         if days_ago < 7:
@@ -741,6 +805,15 @@ def populate_messages(db, messages):
             except Exception as e:
                 print(f"Error adding message {message['id']}: {e}")
 
+def populate_message_columns(db, columns):
+    """Populate the messages subcollections from compact columns with batched writes."""
+    if not db:
+        return
+    
+    # Each dict is built just before its write and dropped after the batch commits
+    written = commit_in_batches(db, message_writes(db, columns))
+    print(f"Added {written} messages to {len(columns.chats)} chats")
+
 def populate_wallet_transactions(db, transactions):
     """Populate the walletTransactions collection with sample data."""
     if not db:
@@ -827,47 +900,227 @@ def populate_reports(db, reports):
         except Exception as e:
             print(f"Error adding report {report['id']}: {e}")
 
+def load_existing_ids(db, collection_name):
+    """Load the document IDs of a collection with a key-only query."""
+    if not db:
+        return []
+
+    # An empty projection returns document references without field data
+    docs = db.collection(collection_name).select([]).stream()
+    return [doc.id for doc in docs]
+
+def load_existing_products(db):
+    """Load existing products with only the fields the generators read."""
+    if not db:
+        return []
+
+    products = []
+    docs = db.collection('products').select(['sellerId', 'price', 'listedDate']).stream()
+
+    for doc in docs:
+        data = doc.to_dict()
+        if not data.get('sellerId') or data.get('price') is None:
+            continue
+
+        # Firestore returns timezone-aware timestamps, the generators use naive local time
+        listed_date = data.get('listedDate')
+        if isinstance(listed_date, datetime.datetime):
+            if listed_date.tzinfo is not None:
+                listed_date = listed_date.astimezone().replace(tzinfo=None)
+        else:
+            listed_date = current_time() - datetime.timedelta(days=30)
+
+        products.append({
+            "id": doc.id,
+            "sellerId": data['sellerId'],
+            "price": data['price'],
+            "listedDate": listed_date
+        })
+
+    return products
+
+def append_data(db, num_orders=40, num_reviews=30, num_chats=25, num_messages_per_chat=10):
+    """Generate new activity that references existing users and products."""
+    if not db:
+        return
+
+    print("Loading existing user and product IDs...")
+    user_ids = load_existing_ids(db, 'users')
+    products = load_existing_products(db)
+    print(f"Found {len(user_ids)} users and {len(products)} products")
+
+    # Orders and chats need a counterparty other than the seller
+    if len(user_ids) < 2 or not products:
+        print("Not enough existing users or products to append to. Run without --append first.")
+        return
+
+    print("Generating new data...")
+    orders = generate_orders(products, user_ids, num_orders)
+    reviews = generate_reviews(orders, num_reviews)
+    chats = generate_chats(products, user_ids, num_chats)
+    messages = generate_messages(chats, num_messages_per_chat)
+
+    # Stream every new document through the batched write path
+    print("Writing new documents in batches...")
+    writes = itertools.chain(
+        ((db.collection('orders').document(order['id']), order) for order in orders),
+        ((db.collection('reviews').document(review['id']), review) for review in reviews),
+        ((db.collection('chats').document(chat['id']), chat) for chat in chats),
+        ((db.collection('chats').document(message['chatId']).collection('messages').document(message['id']), message)
+         for message in messages)
+    )
+    written = commit_in_batches(db, writes)
+
+    print("Data append completed successfully!")
+    print(f"Appended {len(orders)} orders")
+    print(f"Appended {len(reviews)} reviews")
+    print(f"Appended {len(chats)} chats")
+    print(f"Appended {len(messages)} messages")
+    print(f"Wrote {written} documents in total")
+
+def generate_fixture(profiler, num_orders=40, num_reviews=30, num_chats=25, num_messages_per_chat=10, compact=False):
+    """Generate every collection and return (collections by name, messages)."""
+    print("Generating sample data...")
+    users = profiler.call(generate_users, 20)  # Generate 20 users
+    user_ids = [user['uid'] for user in users]
+    
+    products = profiler.call(generate_product_data, user_ids)
+    orders = profiler.call(generate_orders, products, user_ids, num_orders)
+    reviews = profiler.call(generate_reviews, orders, num_reviews)
+    chats = profiler.call(generate_chats, products, user_ids, num_chats)
+    if compact:
+        messages = profiler.call(generate_message_columns, chats, num_messages_per_chat)
+    else:
+        messages = profiler.call(generate_messages, chats, num_messages_per_chat)
+    transactions = profiler.call(generate_wallet_transactions, users, orders, 30)
+    reports = profiler.call(generate_reports, products, user_ids, 15)
+    
+    collections = {
+        "users": users,
+        "products": products,
+        "orders": orders,
+        "reviews": reviews,
+        "chats": chats,
+        "walletTransactions": transactions,
+        "reports": reports
+    }
+    return collections, messages
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Populate Firestore with sample marketplace data.")
+    parser.add_argument("--append", action="store_true",
+                        help="keep existing data and add new orders, reviews, chats and messages")
+    parser.add_argument("--orders", type=int, default=40, help="number of orders to generate")
+    parser.add_argument("--reviews", type=int, default=30, help="number of reviews to generate")
+    parser.add_argument("--chats", type=int, default=25, help="number of chats to generate")
+    parser.add_argument("--messages-per-chat", type=int, default=10,
+                        help="maximum number of messages per chat")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep generated messages in compact columns instead of dicts")
+    parser.add_argument("--seed", type=int,
+                        help="seed the generators so reruns produce identical data")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat, default=DEFAULT_AS_OF,
+                        help=f"reference date of generated timestamps with --seed (default: {DEFAULT_AS_OF})")
+    parser.add_argument("--sync", choices=["manifest", "field"],
+                        help="write only changed documents, comparing against a local manifest or a stored hash field")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="manifest file used by --sync manifest")
+    parser.add_argument("--skew", action="store_true",
+                        help="use Zipf distributions with the default exponents for every skew below")
+    parser.add_argument("--seller-skew", type=float, help="Zipf exponent of seller popularity")
+    parser.add_argument("--demand-skew", type=float,
+                        help="Zipf exponent of product demand; popular products get many orders and chats")
+    parser.add_argument("--chat-length-skew", type=float, help="power-law exponent of messages per chat")
+    parser.add_argument("--activity-skew", type=float, help="Zipf exponent of per-user buying and reporting")
+    parser.add_argument("--targets", nargs="+",
+                        help="write the same data to several targets: default, emulator:HOST:PORT[@project] or a key file")
+    parser.add_argument("--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH,
+                        help="batches queued per target in --targets mode")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    profiler = PhaseProfiler.from_args(args)
     print("Starting Firebase data population script...")
     
-    try:
-        db = initialize_firebase()
-        print(f"Database connection result: {db}")
-        if not db:
-            print("Failed to initialize Firebase. Exiting.")
+    # Fan-out mode opens one client per target instead of the default one
+    if args.targets:
+        if args.append or args.sync:
+            print("--targets cannot be combined with --append or --sync. Exiting.")
+            return
+        db = None
+        targets = profiler.call(open_targets, args.targets)
+        if not targets:
+            print("Failed to initialize a target. Exiting.")
             return
-    except Exception as e:
-        print(f"Exception during Firebase initialization: {e}")
-        import traceback
-        traceback.print_exc()
+    else:
+        try:
+            db = profiler.call(initialize_firebase)
+            print(f"Database connection result: {db}")
+            if not db:
+                print("Failed to initialize Firebase. Exiting.")
+                return
+        except Exception as e:
+            print(f"Exception during Firebase initialization: {e}")
+            import traceback
+            traceback.print_exc()
+            return
+    
+    skew = {name: getattr(args, f"{name}_skew") for name in DEFAULT_SKEW}
+    if args.skew:
+        skew = {name: exponent if exponent is not None else DEFAULT_SKEW[name] for name, exponent in skew.items()}
+    set_skew(**skew)
+    
+    # Grow the existing dataset instead of replacing it
+    if args.append:
+        profiler.call(append_data, db, args.orders, args.reviews, args.chats, args.messages_per_chat)
+        profiler.report()
         return
     
-    # Clear all existing data from the database
-    clear_all_collections(db)
+    # Syncing replaces only what changed and each target clears itself, so nothing is cleared here
+    if not args.sync and not args.targets:
+        # Clear all existing data from the database
+        profiler.call(clear_all_collections, db)
+    
+    if args.seed is not None:
+        set_seed(args.seed, args.as_of)
+    elif args.sync:
+        print("Warning: without --seed every document differs from the previous run")
     
     # Generate all data
-    print("Generating sample data...")
-    users = generate_users(20)  # Generate 20 users
-    user_ids = [user['uid'] for user in users]
+    collections, messages = generate_fixture(profiler, args.orders, args.reviews, args.chats,
+                                             args.messages_per_chat, args.compact)
+    users, products, orders, reviews, chats, transactions, reports = (
+        collections[name] for name in ("users", "products", "orders", "reviews", "chats",
+                                       "walletTransactions", "reports"))
+    
+    if args.targets:
+        print(f"Populating {len(targets)} targets from one generation pass...")
+        profiler.call(fan_out, targets, fixture_documents(collections, messages),
+                      prepare=clear_target, queue_depth=args.queue_depth)
+        profiler.report()
+        return
     
-    products = generate_product_data(user_ids)
-    orders = generate_orders(products, user_ids, 40)
-    reviews = generate_reviews(orders, 30)
-    chats = generate_chats(products, user_ids, 25)
-    messages = generate_messages(chats, 10)
-    transactions = generate_wallet_transactions(users, orders, 30)
-    reports = generate_reports(products, user_ids, 15)
+    if args.sync:
+        print(f"Syncing Firebase collections ({args.sync} mode)...")
+        profiler.call(sync_fixture, db, collections, messages, args.sync, args.manifest)
+        profiler.report()
+        return
     
     # Populate collections
     print("Populating Firebase collections...")
-    populate_users(db, users)
-    populate_products(db, products)
-    populate_orders(db, orders)
-    populate_reviews(db, reviews)
-    populate_chats(db, chats)
-    populate_messages(db, messages)
-    populate_wallet_transactions(db, transactions)
-    populate_reports(db, reports)
+    profiler.call(populate_users, db, users)
+    profiler.call(populate_products, db, products)
+    profiler.call(populate_orders, db, orders)
+    profiler.call(populate_reviews, db, reviews)
+    profiler.call(populate_chats, db, chats)
+    if args.compact:
+        profiler.call(populate_message_columns, db, messages)
+    else:
+        profiler.call(populate_messages, db, messages)
+    profiler.call(populate_wallet_transactions, db, transactions)
+    profiler.call(populate_reports, db, reports)
     
     print("Data population completed successfully!")
     print(f"Created {len(users)} users")
@@ -878,6 +1131,8 @@ def main():
     print(f"Created {len(messages)} messages")
     print(f"Created {len(transactions)} wallet transactions")
     print(f"Created {len(reports)} reports")
+    
+    profiler.report()
 
 if __name__ == "__main__":
     main()
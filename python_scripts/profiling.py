@@ -0,0 +1,117 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+# Functions and allocation sites listed per phase
+DEFAULT_TOP = 15
+
+def add_profiling_args(parser):
+    """Add the --profile and --trace-memory switches to a script's parser."""
+    parser.add_argument("--profile", action="store_true", help="profile each phase with cProfile")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="trace each phase's peak memory and allocation sites")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help="functions and allocation sites shown per phase")
+    parser.add_argument("--profile-dir", help="also save each phase's cProfile stats as <phase>.prof here")
+    return parser
+
+class PhaseProfiler:
+    """Time, profile and memory-trace named phases of a script."""
+
+    def __init__(self, profile=False, trace_memory=False, top=DEFAULT_TOP, output_dir=None):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.output_dir = output_dir
+        self.enabled = profile or trace_memory
+        self.phases = []  # (name, seconds, stats text, peak bytes, allocation lines)
+        self.active = False
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_args(cls, args):
+        """Build a profiler from parsed add_profiling_args() switches."""
+        return cls(args.profile, args.trace_memory, args.profile_top, args.profile_dir)
+
+    @contextmanager
+    def phase(self, name):
+        """Measure the enclosed block as one phase."""
+        # Nested phases are measured as part of the outer one; cProfile cannot nest
+        if not self.enabled or self.active:
+            yield
+            return
+
+        self.active = True
+        profiler = cProfile.Profile() if self.profile else None
+        before = None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            self.active = False
+            self.record(name, elapsed, profiler, before)
+
+    def call(self, function, *args, **kwargs):
+        """Run a function as a phase named after it and return its result."""
+        with self.phase(function.__name__):
+            return function(*args, **kwargs)
+
+    def record(self, name, elapsed, profiler, before):
+        """Keep the numbers of a finished phase for the report."""
+        # Memory is read before pstats allocates its report
+        peak = None
+        allocations = []
+        if before is not None:
+            peak = tracemalloc.get_traced_memory()[1]
+            # Leave out tracemalloc's own bookkeeping from both snapshots
+            own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            after = tracemalloc.take_snapshot().filter_traces(own)
+            diff = after.compare_to(before.filter_traces(own), "lineno")
+            allocations = [str(stat) for stat in diff[:self.top]]
+
+        stats_text = ""
+        if profiler:
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            stats_text = stream.getvalue()
+            if self.output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+                stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+
+        self.phases.append((name, elapsed, stats_text, peak, allocations))
+
+    def report(self):
+        """Print the per-phase report."""
+        if not self.enabled or not self.phases:
+            return
+
+        print("\n===== Phase Report =====")
+        print(f"{'phase':<32} {'seconds':>10} {'peak MiB':>10}")
+        for name, elapsed, _, peak, _ in self.phases:
+            peak_text = f"{peak / (1024 * 1024):.1f}" if peak is not None else "-"
+            print(f"{name:<32} {elapsed:>10.3f} {peak_text:>10}")
+
+        for name, _, stats_text, _, allocations in self.phases:
+            print(f"\n----- {name} -----")
+            if stats_text:
+                print(stats_text.strip())
+            if allocations:
+                print("\nTop allocation sites:")
+                for line in allocations:
+                    print(f"  {line}")
@@ -0,0 +1,136 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Documents fetched per get_all() round trip
+DEFAULT_MAX_BATCH = 100
+
+# Seconds a load waits for others to join its batch
+DEFAULT_WINDOW = 0.005
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_TTL = 60.0
+
+class DocumentLoader:
+    """Coalesce point reads into batched get_all() calls behind an LRU cache with TTL."""
+
+    def __init__(self, db, field_paths=None, max_batch=DEFAULT_MAX_BATCH, window=DEFAULT_WINDOW,
+                 cache_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL):
+        self.db = db
+        self.field_paths = field_paths
+        self.max_batch = max_batch
+        self.window = window
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # path -> (expires at, data or None when missing)
+        self.pending = {}  # path -> Future shared by every caller waiting on it
+        self.timer = None
+        self.stats = {"requests": 0, "hits": 0, "coalesced": 0, "roundTrips": 0, "fetched": 0}
+
+    def cached(self, path):
+        """Return (True, data) for a fresh cache entry, else (False, None). Call with the lock held."""
+        entry = self.cache.get(path)
+        if entry is None:
+            return False, None
+        expires, data = entry
+        if expires < time.monotonic():
+            del self.cache[path]
+            return False, None
+        self.cache.move_to_end(path)
+        return True, data
+
+    def load_async(self, path):
+        """Return a Future resolving to the document's data, or None if it does not exist."""
+        flush_now = False
+        with self.lock:
+            self.stats["requests"] += 1
+            hit, data = self.cached(path)
+            if hit:
+                self.stats["hits"] += 1
+                future = Future()
+                future.set_result(data)
+                return future
+
+            # Callers asking for a path that is already queued share its read
+            future = self.pending.get(path)
+            if future is None:
+                future = self.pending[path] = Future()
+                if len(self.pending) >= self.max_batch:
+                    flush_now = True
+                elif self.timer is None:
+                    self.timer = threading.Timer(self.window, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+            else:
+                self.stats["coalesced"] += 1
+
+        if flush_now:
+            self.flush()
+        return future
+
+    def load(self, path):
+        """Return one document's data, or None if it does not exist."""
+        return self.load_async(path).result()
+
+    def load_many(self, paths):
+        """Return {path: data or None} for several documents, in as few round trips as possible."""
+        futures = {path: self.load_async(path) for path in paths}
+        # A sequential caller has nobody to wait for, so the batch goes out right away
+        self.flush()
+        return {path: future.result() for path, future in futures.items()}
+
+    def flush(self):
+        """Fetch every queued path with get_all() and resolve the waiting futures."""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        paths = list(pending)
+        for i in range(0, len(paths), self.max_batch):
+            chunk = paths[i:i + self.max_batch]
+            try:
+                refs = [self.db.document(path) for path in chunk]
+                snapshots = self.db.get_all(refs, field_paths=self.field_paths)
+                found = {snapshot.reference.path: (snapshot.to_dict() or {}) if snapshot.exists else None
+                         for snapshot in snapshots}
+            except Exception as e:
+                for path in chunk:
+                    pending[path].set_exception(e)
+                continue
+
+            expires = time.monotonic() + self.ttl
+            with self.lock:
+                self.stats["roundTrips"] += 1
+                self.stats["fetched"] += len(chunk)
+                for path in chunk:
+                    # Missing documents are cached too, so repeated misses stay cheap
+                    self.cache[path] = (expires, found.get(path))
+                    self.cache.move_to_end(path)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            for path in chunk:
+                pending[path].set_result(found.get(path))
+
+    def invalidate(self, path=None):
+        """Drop one path, or the whole cache."""
+        with self.lock:
+            if path is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(path, None)
+
+    @property
+    def hit_rate(self):
+        requests = self.stats["requests"]
+        return self.stats["hits"] / requests if requests else 0.0
+
+    def summary(self):
+        """Return a one-line description of cache and round-trip counts."""
+        return (f"{self.stats['requests']} reads, {self.hit_rate * 100:.1f}% cache hits, "
+                f"{self.stats['coalesced']} coalesced, {self.stats['roundTrips']} round trips for {self.stats['fetched']} documents")
@@ -0,0 +1,131 @@
+import argparse
+import datetime
+
+from firebase_common import initialize_firebase, commit_in_batches, delete_in_batches, to_utc
+
+# Collection holding one rollup document per seller and month
+ROLLUP_COLLECTION = "sellerSalesRollups"
+
+# Orders in these statuses do not count toward revenue or units
+EXCLUDED_STATUSES = {"Cancelled"}
+
+def rollup_doc_id(seller_id, month):
+    """Return the rollup document ID for a seller and a YYYY-MM month."""
+    return f"{seller_id}_{month}"
+
+def accumulate_order(rollups, order):
+    """Add one order to the in-memory per-seller, per-day aggregates."""
+    seller_id = order.get("sellerId")
+    purchase_date = to_utc(order.get("purchaseDate"))
+    if not seller_id or purchase_date is None:
+        return False
+
+    month = purchase_date.strftime("%Y-%m")
+    days = rollups.setdefault((seller_id, month), {})
+    day = days.setdefault(purchase_date.day, {"revenue": 0.0, "units": 0, "orders": 0, "cancelled": 0})
+
+    if order.get("status") in EXCLUDED_STATUSES:
+        day["cancelled"] += 1
+        return True
+
+    # Order price is the total paid for all units
+    day["revenue"] += float(order.get("price") or 0)
+    day["units"] += int(order.get("quantity") or 0)
+    day["orders"] += 1
+    return True
+
+def compute_rollups(db, seller_id=None):
+    """Aggregate orders per seller per day in a single streaming pass."""
+    query = db.collection('orders')
+    if seller_id:
+        query = query.where('sellerId', '==', seller_id)
+
+    # Only read the fields the rollup needs
+    query = query.select(['sellerId', 'price', 'quantity', 'purchaseDate', 'status'])
+
+    rollups = {}
+    scanned = 0
+    skipped = 0
+    for doc in query.stream():
+        if not accumulate_order(rollups, doc.to_dict()):
+            skipped += 1
+        scanned += 1
+
+    print(f"Scanned {scanned} orders ({skipped} without seller or purchase date)")
+    return rollups
+
+def build_rollup_doc(seller_id, month, days, updated_at):
+    """Build the compact rollup document for one seller-month."""
+    # Only days with activity are stored, in calendar order
+    day_entries = []
+    for day in sorted(days):
+        totals = days[day]
+        day_entries.append({
+            "day": day,
+            "revenue": round(totals["revenue"], 2),
+            "units": totals["units"],
+            "orders": totals["orders"],
+            "cancelled": totals["cancelled"]
+        })
+
+    return {
+        "sellerId": seller_id,
+        "month": month,
+        "days": day_entries,
+        "totalRevenue": round(sum(entry["revenue"] for entry in day_entries), 2),
+        "totalUnits": sum(entry["units"] for entry in day_entries),
+        "totalOrders": sum(entry["orders"] for entry in day_entries),
+        "updatedAt": updated_at
+    }
+
+def write_rollups(db, rollups, seller_id=None):
+    """Write rollup documents and remove ones that no longer have orders."""
+    rollup_collection = db.collection(ROLLUP_COLLECTION)
+    updated_at = datetime.datetime.now(datetime.timezone.utc)
+
+    writes = (
+        (rollup_collection.document(rollup_doc_id(seller, month)), build_rollup_doc(seller, month, days, updated_at))
+        for (seller, month), days in rollups.items()
+    )
+    written = commit_in_batches(db, writes)
+
+    # Find stale rollups with a key-only query
+    existing = rollup_collection.where('sellerId', '==', seller_id) if seller_id else rollup_collection
+    current_ids = {rollup_doc_id(seller, month) for seller, month in rollups}
+    stale = [doc.reference for doc in existing.select([]).stream() if doc.id not in current_ids]
+    deleted = delete_in_batches(db, stale)
+
+    return written, deleted
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Materialize per-seller daily sales rollups from orders.")
+    parser.add_argument("--seller", help="only rebuild rollups for this seller ID")
+    parser.add_argument("--dry-run", action="store_true", help="compute rollups without writing them")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting seller sales rollup...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    rollups = compute_rollups(db, args.seller)
+    sellers = {seller for seller, _ in rollups}
+    print(f"Computed {len(rollups)} seller-month rollups for {len(sellers)} sellers")
+
+    if args.dry_run:
+        for (seller, month), days in sorted(rollups.items()):
+            revenue = sum(totals["revenue"] for totals in days.values())
+            print(f"{seller} {month}: {len(days)} days, revenue {revenue:.2f}")
+        return
+
+    written, deleted = write_rollups(db, rollups, args.seller)
+    print(f"Wrote {written} rollup documents to {ROLLUP_COLLECTION}")
+    print(f"Deleted {deleted} stale rollup documents")
+
+if __name__ == "__main__":
+    main()
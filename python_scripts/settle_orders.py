@@ -0,0 +1,239 @@
+import time
+import argparse
+import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_common import initialize_firebase
+
+# Next status of each order that can still move, as in admin_order_management_page.dart
+NEXT_STATUS = {
+    "Pending": "Processed",
+    "Processed": "Out For Delivery",
+    "Out For Delivery": "Received"
+}
+
+# Orders per transaction. Each order takes up to 3 writes plus one balance write per user,
+# well below the 500-write limit.
+DEFAULT_GROUP_SIZE = 50
+MAX_GROUP_SIZE = 100
+
+# Order IDs fetched per page
+PAGE_SIZE = 500
+
+# Firestore caps the values of an 'in' filter at 30
+IN_QUERY_LIMIT = 30
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+def ledger_id(order_id, entry_type):
+    """Return a stable walletTransactions ID so a retried settlement never posts twice."""
+    # The full order ID keeps entries of different orders apart and out of the
+    # generator's random transaction_xxxxxxxx IDs
+    return f"transaction_{order_id}_{entry_type.lower()}"
+
+def eligible_pages(db, status, page_size=PAGE_SIZE, limit=None):
+    """Yield pages of order IDs in a status with key-only paginated queries."""
+    base = db.collection('orders').where('status', '==', status).order_by('__name__').select([])
+    last = None
+    seen = 0
+    while limit is None or seen < limit:
+        size = page_size if limit is None else min(page_size, limit - seen)
+        query = base.start_after(last) if last else base
+        page = list(query.limit(size).stream())
+        if not page:
+            break
+        yield [doc.id for doc in page]
+        seen += len(page)
+        last = page[-1]
+
+def already_posted(db, order_ids):
+    """Return IDs of orders that already have ledger entries, e.g. from app checkout."""
+    posted = set()
+    for i in range(0, len(order_ids), IN_QUERY_LIMIT):
+        chunk = order_ids[i:i + IN_QUERY_LIMIT]
+        query = db.collection('walletTransactions').where('relatedOrderId', 'in', chunk).select(['relatedOrderId'])
+        posted.update((doc.to_dict() or {}).get('relatedOrderId') for doc in query.stream())
+    return posted
+
+def existing_users(db, user_ids):
+    """Return which users exist, read outside the transaction so users are never locked."""
+    if not user_ids:
+        return set()
+    refs = [db.collection('users').document(user_id) for user_id in user_ids]
+    return {snapshot.id for snapshot in db.get_all(refs, field_paths=[]) if snapshot.exists}
+
+def settle_group(db, order_ids, status, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Advance one group of orders a step in a single transaction, posting ledger entries on Processed."""
+    from firebase_admin import firestore
+    from google.api_core import exceptions as api_exceptions
+
+    next_status = NEXT_STATUS[status]
+    posts_ledger = status == "Pending"
+    posted = already_posted(db, order_ids) if posts_ledger else set()
+    order_refs = [db.collection('orders').document(order_id) for order_id in order_ids]
+    result = {"advanced": 0, "ledgerPairs": 0, "skipped": 0, "insufficient": 0, "attempts": 0, "error": None}
+
+    @firestore.transactional
+    def run(transaction):
+        result["attempts"] += 1
+        counts = {"advanced": 0, "ledgerPairs": 0, "skipped": 0, "insufficient": 0}
+
+        # Re-read inside the transaction so an order moved by an admin meanwhile is left alone
+        orders = [snapshot for snapshot in db.get_all(order_refs, transaction=transaction)
+                  if snapshot.exists and (snapshot.to_dict() or {}).get('status') == status]
+        counts["skipped"] = len(order_ids) - len(orders)
+
+        to_post = []
+        if posts_ledger:
+            candidates = [order for order in orders if order.id not in posted]
+            ledger_refs = [db.collection('walletTransactions').document(ledger_id(order.id, "Purchase"))
+                           for order in candidates]
+            existing = {snapshot.id for snapshot in db.get_all(ledger_refs, transaction=transaction)
+                        if snapshot.exists}
+            to_post = [order for order in candidates if ledger_id(order.id, "Purchase") not in existing]
+            parties = {order.id: ((order.to_dict() or {}).get('buyerId'), (order.to_dict() or {}).get('sellerId'))
+                       for order in to_post}
+            users = existing_users(db, {user_id for pair in parties.values() for user_id in pair if user_id})
+            # Orders whose buyer or seller is gone advance without moving money
+            to_post = [order for order in to_post if all(user_id in users for user_id in parties[order.id])]
+
+            # Buyers are read in the transaction so a balance never goes negative.
+            # Orders the buyer cannot pay for stay Pending.
+            buyer_refs = [db.collection('users').document(user_id)
+                          for user_id in {buyer_id for buyer_id, _ in parties.values()} & users]
+            balances = {snapshot.id: float((snapshot.to_dict() or {}).get('walletBalance') or 0)
+                        for snapshot in db.get_all(buyer_refs, field_paths=['walletBalance'], transaction=transaction)}
+            payable = []
+            for order in to_post:
+                buyer_id = parties[order.id][0]
+                amount = float((order.to_dict() or {}).get('price') or 0)
+                if balances.get(buyer_id, 0) < amount:
+                    counts["insufficient"] += 1
+                    continue
+                balances[buyer_id] -= amount
+                payable.append(order)
+            unpaid = {order.id for order in to_post} - {order.id for order in payable}
+            to_post = payable
+            orders = [order for order in orders if order.id not in unpaid]
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        deltas = defaultdict(float)
+        for order in to_post:
+            data = order.to_dict()
+            amount = float(data.get('price') or 0)
+            for user_id, entry_type, signed, description in (
+                (data['buyerId'], "Purchase", -amount, f"Payment for order {order.id}"),
+                (data['sellerId'], "Sale", amount, f"Payment received for order {order.id}")
+            ):
+                transaction_id = ledger_id(order.id, entry_type)
+                transaction.set(db.collection('walletTransactions').document(transaction_id), {
+                    "id": transaction_id,
+                    "userId": user_id,
+                    "type": entry_type,
+                    "amount": signed,
+                    "description": description,
+                    "relatedOrderId": order.id,
+                    "timestamp": now
+                })
+                deltas[user_id] += signed
+            counts["ledgerPairs"] += 1
+
+        # One increment per user keeps each document to a single write per transaction
+        for user_id, delta in deltas.items():
+            transaction.update(db.collection('users').document(user_id),
+                               {'walletBalance': firestore.Increment(round(delta, 2))})
+        for order in orders:
+            transaction.update(order.reference, {'status': next_status})
+        counts["advanced"] = len(orders)
+        return counts
+
+    try:
+        result.update(run(db.transaction(max_attempts=max_attempts)))
+    except (ValueError, api_exceptions.GoogleAPICallError) as e:
+        # The transactional wrapper raises ValueError once all attempts are used up. Other API
+        # errors, such as a user deleted before commit, fail only this group.
+        result["error"] = str(e)
+    return result
+
+def settle(db, statuses, group_size=DEFAULT_GROUP_SIZE, workers=8, limit=None,
+           max_attempts=DEFAULT_MAX_ATTEMPTS, dry_run=False):
+    """Advance every eligible order one step, later statuses first."""
+    totals = defaultdict(lambda: defaultdict(int))
+    start = time.perf_counter()
+
+    # Later stages go first so no order moves more than one step per run
+    for status in sorted(statuses, key=list(NEXT_STATUS).index, reverse=True):
+        print(f"Settling {status} -> {NEXT_STATUS[status]}...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for page in eligible_pages(db, status, limit=limit):
+                if dry_run:
+                    totals[status]["eligible"] += len(page)
+                    continue
+                for i in range(0, len(page), group_size):
+                    futures.append(executor.submit(settle_group, db, page[i:i + group_size], status, max_attempts))
+
+            for future in futures:
+                result = future.result()
+                stats = totals[status]
+                stats["groups"] += 1
+                stats["retries"] += max(0, result["attempts"] - 1)
+                if result["error"]:
+                    stats["failedGroups"] += 1
+                    print(f"Group failed after {result['attempts']} attempts: {result['error']}")
+                    continue
+                for key in ("advanced", "ledgerPairs", "skipped", "insufficient"):
+                    stats[key] += result[key]
+
+    elapsed = time.perf_counter() - start
+    return totals, elapsed
+
+def group_size(value):
+    """Parse --group-size, which must fit one transaction."""
+    size = int(value)
+    if not 1 <= size <= MAX_GROUP_SIZE:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_GROUP_SIZE}")
+    return size
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Advance orders one status step in bulk and post their ledger entries.")
+    parser.add_argument("--statuses", nargs="+", choices=list(NEXT_STATUS), default=list(NEXT_STATUS),
+                        help="source statuses to advance")
+    parser.add_argument("--group-size", type=group_size, default=DEFAULT_GROUP_SIZE,
+                        help=f"orders per transaction, at most {MAX_GROUP_SIZE}")
+    parser.add_argument("--workers", type=int, default=8, help="transactions in flight at once")
+    parser.add_argument("--limit", type=int, help="maximum orders per status")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="attempts per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="count eligible orders without changing anything")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting order settlement...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    totals, elapsed = settle(db, args.statuses, args.group_size, args.workers, args.limit,
+                             args.max_attempts, args.dry_run)
+
+    if args.dry_run:
+        for status, stats in totals.items():
+            print(f"{status}: {stats['eligible']} orders would move to {NEXT_STATUS[status]}")
+        return
+
+    advanced = 0
+    print(f"\n{'from status':<18} {'advanced':>9} {'ledger':>7} {'skipped':>8} {'unpaid':>7} {'groups':>7} {'failed':>7} {'retries':>8}")
+    for status, stats in totals.items():
+        advanced += stats["advanced"]
+        print(f"{status:<18} {stats['advanced']:>9} {stats['ledgerPairs']:>7} {stats['skipped']:>8} {stats['insufficient']:>7} "
+              f"{stats['groups']:>7} {stats['failedGroups']:>7} {stats['retries']:>8}")
+    rate = advanced / elapsed * 60 if elapsed else 0.0
+    print(f"\nAdvanced {advanced} orders in {elapsed:.1f}s ({rate:.0f} orders/min)")
+
+if __name__ == "__main__":
+    main()
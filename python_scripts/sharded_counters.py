@@ -0,0 +1,197 @@
+import time
+import random
+import argparse
+from collections import defaultdict
+
+from firebase_common import initialize_firebase, commit_in_batches, BATCH_SIZE
+
+# Shards live in a subcollection of the document that owns the counter
+SHARDS_COLLECTION = "counterShards"
+
+# Shards per counter. Each shard takes roughly one sustained write per second.
+DEFAULT_NUM_SHARDS = {
+    "adBoost": 10,
+    "walletBalance": 10
+}
+
+def counter_num_shards(counter):
+    """Return the shard count for a counter, keyed by its top-level field."""
+    return DEFAULT_NUM_SHARDS.get(counter.split('.')[0], 5)
+
+def shard_ref(doc_ref, counter, shard):
+    """Return the reference of one shard of a counter."""
+    return doc_ref.collection(SHARDS_COLLECTION).document(f"{counter}_{shard}")
+
+# Fields whose writers go through the shards. Checkout still writes products.stock
+# directly and the app resets chats.unreadCount to 0 when a chat is read, which
+# pending shard increments would undo, so neither is sharded or compacted.
+SHARDED_FIELDS = ["adBoost", "walletBalance"]
+
+def provision_writes(doc_ref, counter, num_shards=None):
+    """Build the writes that create a counter's empty shards."""
+    num_shards = num_shards or counter_num_shards(counter)
+    return [(shard_ref(doc_ref, counter, shard), {"counter": counter, "shard": shard, "count": 0})
+            for shard in range(num_shards)]
+
+def increment(doc_ref, counter, amount=1, num_shards=None):
+    """Add to a counter by incrementing one random shard."""
+    from firebase_admin import firestore
+
+    num_shards = num_shards or counter_num_shards(counter)
+    shard = random.randrange(num_shards)
+    # A merge creates the shard if the counter was never provisioned, which is safe
+    # because shards only hold increments not yet folded into the owning field
+    shard_ref(doc_ref, counter, shard).set(
+        {"counter": counter, "shard": shard, "count": firestore.Increment(amount)}, merge=True)
+
+def field_value(data, counter):
+    """Return the owning field of a counter, following dotted map keys."""
+    value = data
+    for part in counter.split('.'):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value or 0
+
+def read_counter(doc_ref, counter):
+    """Read a counter as its owning field plus the increments still held in its shards."""
+    base = field_value(doc_ref.get().to_dict() or {}, counter)
+    shards = doc_ref.collection(SHARDS_COLLECTION).where('counter', '==', counter).select(['count']).stream()
+    return base + sum((shard.to_dict() or {}).get('count', 0) for shard in shards)
+
+def provisioned_counters(db):
+    """Return (owner path, counter) of every counter that already has shards."""
+    return {(shard.reference.parent.parent.path, (shard.to_dict() or {}).get('counter'))
+            for shard in db.collection_group(SHARDS_COLLECTION).select(['counter']).stream()}
+
+def migration_writes(db, collection_name, provisioned=frozenset()):
+    """Build shard writes for the hot fields of a collection, skipping counters that have shards."""
+    collection = db.collection(collection_name)
+
+    def counters():
+        if collection_name == 'products':
+            for doc in collection.select([]).stream():
+                yield doc.reference, 'adBoost'
+        elif collection_name == 'users':
+            # Every user can sell, so every wallet gets shards
+            for doc in collection.select([]).stream():
+                yield doc.reference, 'walletBalance'
+
+    for doc_ref, counter in counters():
+        if (doc_ref.path, counter) not in provisioned:
+            yield from provision_writes(doc_ref, counter)
+
+def migrate(db, collection_names):
+    """Provision empty shards for the hot fields of each collection. Field values stay where they are."""
+    provisioned = provisioned_counters(db)
+    for collection_name in collection_names:
+        print(f"Migrating {collection_name} counters to shards...")
+        written = commit_in_batches(db, migration_writes(db, collection_name, provisioned))
+        print(f"Wrote {written} shard documents for {collection_name}")
+
+def fold_writes(batch, owner_ref, shards):
+    """Add one owner's shard counts to its fields and take the same amounts off the shards."""
+    from firebase_admin import firestore
+
+    totals = defaultdict(float)
+    for ref, counter, count in shards:
+        totals[counter] += count
+        batch.update(ref, {'count': firestore.Increment(-count)})
+    # Dotted counter names update one key of a map field
+    batch.update(owner_ref, {counter: firestore.Increment(round(total, 2) if counter == 'walletBalance' else int(total))
+                             for counter, total in totals.items()})
+    return len(shards) + 1
+
+def compact(db, fields):
+    """Fold the shards of the given fields into their owning documents."""
+    from google.api_core import exceptions as api_exceptions
+
+    # Shards hold only increments not yet folded in, so adding them to the owning field
+    # keeps direct writes to the same field (such as checkout debiting a buyer) intact.
+    # Increments landing on a shard meanwhile stay on it, because the shard is
+    # decremented by exactly the amount that was read.
+    pending = defaultdict(list)  # owner path -> [(shard ref, counter, count)]
+    owners = {}
+    for shard in db.collection_group(SHARDS_COLLECTION).select(['counter', 'count']).stream():
+        data = shard.to_dict() or {}
+        counter, count = data.get('counter'), data.get('count') or 0
+        if not counter or not count or counter.split('.')[0] not in fields:
+            continue
+        owner_ref = shard.reference.parent.parent
+        owners[owner_ref.path] = owner_ref
+        pending[owner_ref.path].append((shard.reference, counter, count))
+
+    folded = 0
+    failed = []
+    paths = list(pending)
+    # Each owner takes at most one write per shard plus one, well inside a 500-write batch
+    max_writes = BATCH_SIZE - max(DEFAULT_NUM_SHARDS.values()) - 1
+    while paths:
+        batch = db.batch()
+        group = []
+        writes = 0
+        while paths and writes < max_writes:
+            path = paths.pop()
+            writes += fold_writes(batch, owners[path], pending[path])
+            group.append(path)
+        try:
+            batch.commit()
+            folded += len(group)
+        except api_exceptions.GoogleAPICallError:
+            # One missing owner fails the whole batch, so retry its owners one by one
+            for path in group:
+                single = db.batch()
+                fold_writes(single, owners[path], pending[path])
+                try:
+                    single.commit()
+                    folded += 1
+                except api_exceptions.GoogleAPICallError as e:
+                    failed.append(f"{path}: {e}")
+
+    print(f"Folded shards into {folded} documents")
+    for failure in failed:
+        print(f"Could not fold {failure}")
+    return folded
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage sharded counters for hot fields.")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="convert existing fields to sharded counters")
+    migrate_parser.add_argument("--collections", nargs="+", default=["products", "users"],
+                                choices=["products", "users"])
+
+    compact_parser = subparsers.add_parser("compact", help="fold shard counts into the owning documents")
+    compact_parser.add_argument("--interval", type=float, default=0,
+                                help="repeat every this many seconds (default: run once)")
+    compact_parser.add_argument("--fields", nargs="+", choices=SHARDED_FIELDS, required=True,
+                                help="fields to compact")
+
+    read_parser = subparsers.add_parser("read", help="print the value of one counter")
+    read_parser.add_argument("document", help="document path, e.g. products/electronics_1a2b3c4d")
+    read_parser.add_argument("counter", help="counter name, e.g. adBoost or walletBalance")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    if args.action == "migrate":
+        migrate(db, args.collections)
+    elif args.action == "read":
+        print(f"{args.document} {args.counter} = {read_counter(db.document(args.document), args.counter)}")
+    else:
+        compact(db, args.fields)
+        while args.interval > 0:
+            try:
+                time.sleep(args.interval)
+                compact(db, args.fields)
+            except KeyboardInterrupt:
+                print("\nStopping compaction")
+                break
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import datetime
+
+from compact_records import MessageColumns
+
+def make_messages():
+    start = datetime.datetime(2025, 1, 1, 9, 30, 15, 123456)
+    messages = []
+    for i in range(50):
+        messages.append({
+            "id": f"message_{i * 7919:08x}",
+            "senderId": f"buyer_{i % 3}",
+            "text": ["Is this still available?", "Yes it is", "Can you do 50?"][i % 3],
+            "timestamp": start + datetime.timedelta(minutes=i, microseconds=i),
+            "isRead": i % 2 == 0,
+            "imageUrl": "https://example.com/photo.jpg" if i % 10 == 0 else None,
+            "chatId": f"chat_{i // 10}"
+        })
+    # IDs outside the packed message_<8 hex> form are kept as they are
+    messages[3]["id"] = "message_custom"
+    messages[4]["id"] = "legacy-id"
+    return messages
+
+def test_round_trip_matches_input():
+    messages = make_messages()
+    columns = MessageColumns()
+    columns.extend(messages)
+    assert len(columns) == len(messages)
+    assert list(columns) == messages
+
+def test_repeated_strings_are_stored_once():
+    columns = MessageColumns()
+    columns.extend(make_messages())
+    assert len(columns.texts) == 3
+    assert len(columns.users) == 3
+    assert len(columns.chats) == 5
+
+def test_row_access_by_index():
+    messages = make_messages()
+    columns = MessageColumns()
+    columns.extend(messages)
+    assert columns.row(4) == messages[4]
+    assert columns.row(len(messages) - 1) == messages[-1]
@@ -0,0 +1,64 @@
+import random
+from collections import Counter
+
+import pytest
+
+from distributions import AliasTable, ZipfChooser, chooser, power_law_int, zipf_weights
+
+def zipf_pmf(n, exponent):
+    weights = zipf_weights(n, exponent)
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+def table_pmf(table):
+    """Exact probability of every index implied by an alias table's columns."""
+    pmf = [0.0] * table.n
+    for column in range(table.n):
+        pmf[column] += table.prob[column] / table.n
+        if table.alias[column] != column:
+            pmf[table.alias[column]] += (1.0 - table.prob[column]) / table.n
+    return pmf
+
+@pytest.mark.parametrize("n,exponent", [(1, 1.0), (7, 0.8), (50, 1.2), (1000, 1.5)])
+def test_alias_table_encodes_zipf_pmf_exactly(n, exponent):
+    table = AliasTable(zipf_weights(n, exponent))
+    assert table_pmf(table) == pytest.approx(zipf_pmf(n, exponent), abs=1e-12)
+
+def test_alias_sampling_frequencies_match_zipf_pmf():
+    random.seed(1)
+    n, exponent, draws = 10, 1.2, 200000
+    table = AliasTable(zipf_weights(n, exponent))
+    counts = Counter(table.sample() for _ in range(draws))
+    for rank, expected in enumerate(zipf_pmf(n, exponent)):
+        assert counts[rank] / draws == pytest.approx(expected, abs=0.005)
+
+def test_alias_table_rejects_empty_weights():
+    with pytest.raises(ValueError):
+        AliasTable([])
+
+def test_zipf_chooser_skews_towards_shuffled_ranks():
+    random.seed(2)
+    items = [f"item_{i}" for i in range(20)]
+    pick = ZipfChooser(items, 1.1)
+    draws = 100000
+    counts = Counter(pick() for _ in range(draws))
+    assert set(counts) <= set(items)
+    # Each item's frequency follows the pmf of the rank it was shuffled to
+    for rank, expected in enumerate(zipf_pmf(len(items), 1.1)):
+        assert counts[pick.items[rank]] / draws == pytest.approx(expected, abs=0.01)
+
+def test_chooser_without_exponent_is_uniform():
+    random.seed(3)
+    items = ["a", "b", "c", "d"]
+    pick = chooser(items)
+    draws = 40000
+    counts = Counter(pick() for _ in range(draws))
+    for item in items:
+        assert counts[item] / draws == pytest.approx(0.25, abs=0.01)
+
+def test_power_law_int_stays_in_range_and_favours_low():
+    random.seed(4)
+    values = [power_law_int(2, 12, 1.5) for _ in range(20000)]
+    assert min(values) >= 2 and max(values) <= 12
+    counts = Counter(values)
+    assert counts[2] > counts[3] > counts[12]
@@ -0,0 +1,118 @@
+import pytest
+
+import read_loader
+from read_loader import DocumentLoader
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+class FakeRef:
+    def __init__(self, path):
+        self.path = path
+
+class FakeDb:
+    """Serve get_all() from a dict and record the paths of every call."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def document(self, path):
+        return FakeRef(path)
+
+    def get_all(self, refs, field_paths=None):
+        self.calls.append([ref.path for ref in refs])
+        return [FakeSnapshot(ref, self.documents.get(ref.path)) for ref in refs]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(read_loader.time, "monotonic", fake)
+    return fake
+
+def make_db(count=300):
+    return FakeDb({f"products/p{i}": {"name": f"Product {i}"} for i in range(count)})
+
+def make_loader(db, **kwargs):
+    # A long window keeps the timer from flushing behind the test's back
+    return DocumentLoader(db, window=60, **kwargs)
+
+def test_load_many_batches_by_max_batch(clock):
+    db = make_db()
+    loader = make_loader(db, max_batch=100)
+    paths = [f"products/p{i}" for i in range(250)]
+    result = loader.load_many(paths)
+    assert [len(call) for call in db.calls] == [100, 100, 50]
+    assert result["products/p7"] == {"name": "Product 7"}
+    assert loader.stats["roundTrips"] == 3
+
+def test_duplicate_requests_share_one_read(clock):
+    db = make_db()
+    loader = make_loader(db)
+    first = loader.load_async("products/p1")
+    second = loader.load_async("products/p1")
+    loader.flush()
+    assert first.result() == second.result() == {"name": "Product 1"}
+    assert db.calls == [["products/p1"]]
+    assert loader.stats["coalesced"] == 1
+
+def test_missing_documents_are_cached(clock):
+    db = make_db()
+    loader = make_loader(db)
+    assert loader.load_many(["products/missing"]) == {"products/missing": None}
+    assert loader.load_many(["products/missing"]) == {"products/missing": None}
+    assert len(db.calls) == 1
+    assert loader.stats["hits"] == 1
+
+def test_entries_expire_after_ttl(clock):
+    db = make_db()
+    loader = make_loader(db, ttl=30)
+    loader.load_many(["products/p1"])
+    clock.now += 29
+    loader.load_many(["products/p1"])
+    assert len(db.calls) == 1
+    clock.now += 2
+    loader.load_many(["products/p1"])
+    assert len(db.calls) == 2
+
+def test_least_recently_used_entry_is_evicted(clock):
+    db = make_db()
+    loader = make_loader(db, cache_size=2)
+    loader.load_many(["products/p1"])
+    loader.load_many(["products/p2"])
+    # Touching p1 leaves p2 as the least recently used entry
+    loader.load_many(["products/p1"])
+    loader.load_many(["products/p3"])
+    assert list(loader.cache) == ["products/p1", "products/p3"]
+    calls = len(db.calls)
+    loader.load_many(["products/p1"])
+    assert len(db.calls) == calls
+    loader.load_many(["products/p2"])
+    assert db.calls[-1] == ["products/p2"]
+
+def test_failed_fetch_reaches_every_waiter(clock):
+    db = make_db()
+
+    def broken_get_all(refs, field_paths=None):
+        raise RuntimeError("unavailable")
+
+    db.get_all = broken_get_all
+    loader = make_loader(db)
+    future = loader.load_async("products/p1")
+    loader.flush()
+    with pytest.raises(RuntimeError):
+        future.result()
+    assert "products/p1" not in loader.cache
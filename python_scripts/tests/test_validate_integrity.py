@@ -0,0 +1,36 @@
+import pytest
+
+from validate_integrity import BloomIdSet, SortedIdSet
+
+MEMBERS = [f"user_{i:06d}" for i in range(20000)]
+OTHERS = [f"product_{i:06d}" for i in range(20000)]
+
+@pytest.mark.parametrize("make_set", [SortedIdSet, lambda: BloomIdSet(len(MEMBERS))])
+def test_no_false_negatives(make_set):
+    id_set = make_set()
+    for doc_id in MEMBERS:
+        id_set.add(doc_id)
+    id_set.freeze()
+    assert len(id_set) == len(MEMBERS)
+    assert all(doc_id in id_set for doc_id in MEMBERS)
+
+def test_sorted_set_rejects_non_members():
+    id_set = SortedIdSet()
+    for doc_id in MEMBERS:
+        id_set.add(doc_id)
+    id_set.freeze()
+    assert not any(doc_id in id_set for doc_id in OTHERS)
+    assert id_set.nbytes() == 8 * len(MEMBERS)
+
+def test_bloom_false_positive_rate_near_target():
+    id_set = BloomIdSet(len(MEMBERS), error_rate=0.001)
+    for doc_id in MEMBERS:
+        id_set.add(doc_id)
+    false_positives = sum(doc_id in id_set for doc_id in OTHERS)
+    assert false_positives / len(OTHERS) < 0.005
+
+def test_empty_sets_contain_nothing():
+    sorted_set = SortedIdSet()
+    sorted_set.freeze()
+    assert "user_1" not in sorted_set
+    assert "user_1" not in BloomIdSet(0)
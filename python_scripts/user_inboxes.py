@@ -0,0 +1,222 @@
+import time
+import heapq
+import argparse
+import datetime
+import threading
+from collections import defaultdict
+
+from firebase_common import initialize_firebase, commit_in_batches, to_utc
+
+# Collection holding one inbox document per user
+INBOX_COLLECTION = "userInboxes"
+
+# Chats kept per inbox, newest first
+MAX_INBOX_CHATS = 100
+
+# Profile images may be inline base64 data URIs; longer ones are left out of summaries
+MAX_INLINE_IMAGE_LENGTH = 2048
+
+CHAT_FIELDS = ['participants', 'productId', 'lastMessage', 'lastMessageTimestamp',
+               'lastMessageSenderId', 'unreadCount']
+
+def profile_summary(data):
+    """Return the display data of a user shown next to their chats."""
+    image_url = data.get('profileImageUrl')
+    if isinstance(image_url, str) and len(image_url) > MAX_INLINE_IMAGE_LENGTH:
+        image_url = None
+    return {"username": data.get('username') or "", "profileImageUrl": image_url}
+
+def chat_summary(chat_id, data, user_id, profiles):
+    """Build one inbox entry for a chat as seen by user_id."""
+    counterparty_id = next((participant for participant in data.get('participants') or []
+                            if participant != user_id), None)
+    profile = profiles.get(counterparty_id) or {"username": "", "profileImageUrl": None}
+    return {
+        "chatId": chat_id,
+        "productId": data.get('productId'),
+        "counterpartyId": counterparty_id,
+        "counterpartyName": profile["username"],
+        "counterpartyImageUrl": profile["profileImageUrl"],
+        "lastMessage": data.get('lastMessage'),
+        "lastMessageTimestamp": data.get('lastMessageTimestamp'),
+        "lastMessageSenderId": data.get('lastMessageSenderId'),
+        "unreadCount": (data.get('unreadCount') or {}).get(user_id, 0)
+    }
+
+def recency_key(chat_id, data):
+    """Sort key of a chat, newest last message first."""
+    timestamp = to_utc(data.get('lastMessageTimestamp'))
+    return (timestamp.timestamp() if timestamp else 0.0, chat_id)
+
+def load_profiles(db):
+    """Load every user's display data with a projected query."""
+    return {doc.id: profile_summary(doc.to_dict() or {})
+            for doc in db.collection('users').select(['username', 'profileImageUrl']).stream()}
+
+def inbox_doc(user_id, entries, updated_at):
+    """Build the inbox document stored in Firestore."""
+    return {"userId": user_id, "chats": entries, "size": len(entries), "updatedAt": updated_at}
+
+def write_inboxes(db, inboxes):
+    """Write inbox documents in batches."""
+    collection = db.collection(INBOX_COLLECTION)
+    updated_at = datetime.datetime.now(datetime.timezone.utc)
+    writes = ((collection.document(user_id), inbox_doc(user_id, entries, updated_at))
+              for user_id, entries in inboxes.items())
+    return commit_in_batches(db, writes)
+
+def backfill(db, max_chats=MAX_INBOX_CHATS):
+    """Build every user's inbox from one pass over users and one over chats."""
+    profiles = load_profiles(db)
+    print(f"Loaded {len(profiles)} user profiles")
+
+    # Keep the newest chats per user in bounded min-heaps
+    heaps = defaultdict(list)
+    scanned = 0
+    for doc in db.collection('chats').select(CHAT_FIELDS).stream():
+        data = doc.to_dict() or {}
+        key = recency_key(doc.id, data)
+        for user_id in data.get('participants') or []:
+            heap = heaps[user_id]
+            if len(heap) < max_chats:
+                heapq.heappush(heap, (key, doc.id, data))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, doc.id, data))
+        scanned += 1
+    print(f"Scanned {scanned} chats for {len(heaps)} users")
+
+    inboxes = {
+        user_id: [chat_summary(chat_id, data, user_id, profiles)
+                  for _, chat_id, data in sorted(heap, key=lambda entry: entry[0], reverse=True)]
+        for user_id, heap in heaps.items()
+    }
+    written = write_inboxes(db, inboxes)
+    print(f"Wrote {written} inbox documents to {INBOX_COLLECTION}")
+    return written
+
+class InboxUpdater:
+    """Rewrite only the inboxes whose chats or counterparties changed."""
+
+    def __init__(self, db, max_chats=MAX_INBOX_CHATS):
+        self.db = db
+        self.max_chats = max_chats
+        self.lock = threading.Lock()
+        self.profiles = {}
+        self.chats = {}  # chatId -> chat fields
+        self.chats_by_user = defaultdict(set)
+        self.dirty = set()
+        self.synced = set()
+        self.users_loaded = threading.Event()
+        self.watches = []
+
+    def start(self):
+        """Subscribe to users, then to chats once every profile is known."""
+        self.watches = [self.db.collection('users').on_snapshot(self.on_users)]
+        # Chats processed before the first users snapshot would get blank counterparty names
+        self.users_loaded.wait()
+        self.watches.append(self.db.collection('chats').on_snapshot(self.on_chats))
+
+    def stop(self):
+        """Unsubscribe all listeners."""
+        for watch in self.watches:
+            watch.unsubscribe()
+        self.watches = []
+
+    def on_users(self, doc_snapshots, changes, read_time):
+        """Track display data and dirty the inboxes that show a changed user."""
+        with self.lock:
+            initial = 'users' not in self.synced
+            for change in changes:
+                doc = change.document
+                old = self.profiles.get(doc.id)
+                new = None if change.type.name == "REMOVED" else profile_summary(doc.to_dict() or {})
+                if new:
+                    self.profiles[doc.id] = new
+                else:
+                    self.profiles.pop(doc.id, None)
+
+                # Everyone chatting with this user shows their name and avatar
+                if not initial and old != new:
+                    for chat_id in self.chats_by_user.get(doc.id, ()):
+                        self.dirty.update(self.chats[chat_id].get('participants') or [])
+            self.synced.add('users')
+        self.users_loaded.set()
+
+    def on_chats(self, doc_snapshots, changes, read_time):
+        """Track chats and dirty the inboxes of their participants."""
+        with self.lock:
+            initial = 'chats' not in self.synced
+            for change in changes:
+                doc = change.document
+                old = self.chats.pop(doc.id, None)
+                for user_id in (old or {}).get('participants') or []:
+                    self.chats_by_user[user_id].discard(doc.id)
+                    self.dirty.add(user_id)
+
+                if change.type.name != "REMOVED":
+                    data = doc.to_dict() or {}
+                    new = {field: data.get(field) for field in CHAT_FIELDS}
+                    self.chats[doc.id] = new
+                    for user_id in new.get('participants') or []:
+                        self.chats_by_user[user_id].add(doc.id)
+                        self.dirty.add(user_id)
+
+            # The first snapshot leaves every participant dirty, so the first flush backfills
+            # all inboxes from the same state the listener continues from
+            if initial:
+                print(f"Loaded {len(self.chats)} chats; backfilling {len(self.dirty)} inboxes")
+            self.synced.add('chats')
+
+    def flush(self):
+        """Rebuild dirty inboxes from the in-memory index and write them."""
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            inboxes = {}
+            for user_id in dirty:
+                newest = heapq.nlargest(self.max_chats, self.chats_by_user.get(user_id, ()),
+                                        key=lambda chat_id: recency_key(chat_id, self.chats[chat_id]))
+                inboxes[user_id] = [chat_summary(chat_id, self.chats[chat_id], user_id, self.profiles)
+                                    for chat_id in newest]
+
+        if not inboxes:
+            return 0
+        written = write_inboxes(self.db, inboxes)
+        print(f"Updated {written} inboxes")
+        return written
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build per-user inbox documents for single-read chat lists.")
+    parser.add_argument("--max-chats", type=int, default=MAX_INBOX_CHATS, help="chats kept per inbox")
+    parser.add_argument("--watch", action="store_true", help="keep inboxes fresh as chats and users change")
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="seconds between updates in watch mode")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting inbox build...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    if not args.watch:
+        backfill(db, args.max_chats)
+        return
+
+    updater = InboxUpdater(db, args.max_chats)
+    updater.start()
+    print(f"Watching chats and users, updating every {args.flush_interval} seconds. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(args.flush_interval)
+            updater.flush()
+    except KeyboardInterrupt:
+        print("\nStopping updater...")
+    finally:
+        updater.stop()
+        updater.flush()
+
+if __name__ == "__main__":
+    main()
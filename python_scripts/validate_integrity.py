@@ -0,0 +1,196 @@
+import sys
+import json
+import math
+import bisect
+import hashlib
+import argparse
+from array import array
+from collections import defaultdict
+
+from firebase_common import initialize_firebase
+
+# Foreign keys checked, as (collection, field, target ID set). List fields check every element.
+CHECKS = [
+    ('products', 'sellerId', 'sellers'),
+    ('orders', 'productId', 'products'),
+    ('orders', 'buyerId', 'users'),
+    ('orders', 'sellerId', 'users'),
+    ('reviews', 'orderId', 'orders'),
+    ('reviews', 'productId', 'products'),
+    ('reviews', 'reviewerId', 'users'),
+    ('reviews', 'sellerId', 'users'),
+    ('chats', 'productId', 'products'),
+    ('chats', 'participants', 'users'),
+    ('reports', 'productId', 'products'),
+    ('reports', 'reporterId', 'users'),
+    ('reports', 'sellerId', 'users'),
+    ('walletTransactions', 'userId', 'users'),
+    ('walletTransactions', 'relatedOrderId', 'orders')
+]
+
+# Orphans printed per check in the summary
+SAMPLES_PER_CHECK = 5
+
+def id_hash(doc_id):
+    """Hash an ID to 64 bits; collisions are negligible below billions of IDs."""
+    return int.from_bytes(hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+class SortedIdSet:
+    """Exact-enough ID set stored as a sorted array of 64-bit hashes."""
+
+    def __init__(self):
+        self.hashes = array('Q')
+
+    def add(self, doc_id):
+        self.hashes.append(id_hash(doc_id))
+
+    def freeze(self):
+        """Sort once after loading so lookups can bisect."""
+        self.hashes = array('Q', sorted(self.hashes))
+
+    def __contains__(self, doc_id):
+        value = id_hash(doc_id)
+        i = bisect.bisect_left(self.hashes, value)
+        return i < len(self.hashes) and self.hashes[i] == value
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def nbytes(self):
+        return self.hashes.itemsize * len(self.hashes)
+
+class BloomIdSet:
+    """Bloom filter for huge collections; may miss a few orphans, never reports false ones."""
+
+    def __init__(self, expected, error_rate=0.001):
+        expected = max(1, expected)
+        self.num_bits = max(8, int(-expected * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / expected * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, doc_id):
+        # Double hashing derives every probe from one 128-bit digest
+        digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, doc_id):
+        for position in self.positions(doc_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def freeze(self):
+        pass
+
+    def __contains__(self, doc_id):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(doc_id))
+
+    def __len__(self):
+        return self.count
+
+    def nbytes(self):
+        return len(self.bits)
+
+def new_id_set(db, collection_name, bloom_threshold):
+    """Pick a sorted set, or a Bloom filter when the collection is larger than the threshold."""
+    if bloom_threshold:
+        # An aggregation query sizes the filter without reading documents
+        expected = db.collection(collection_name).count().get()[0][0].value
+        if expected > bloom_threshold:
+            return BloomIdSet(expected)
+    return SortedIdSet()
+
+def load_id_sets(db, bloom_threshold=0):
+    """First pass: stream the referenced collections key-only into compact ID sets."""
+    id_sets = {}
+    for collection_name in ('users', 'products', 'orders'):
+        id_sets[collection_name] = new_id_set(db, collection_name, bloom_threshold)
+    id_sets['sellers'] = new_id_set(db, 'users', bloom_threshold)
+
+    for doc in db.collection('users').select(['role']).stream():
+        id_sets['users'].add(doc.id)
+        if (doc.to_dict() or {}).get('role') == 'seller':
+            id_sets['sellers'].add(doc.id)
+    for collection_name in ('products', 'orders'):
+        for doc in db.collection(collection_name).select([]).stream():
+            id_sets[collection_name].add(doc.id)
+
+    for name, id_set in id_sets.items():
+        id_set.freeze()
+        print(f"Loaded {len(id_set)} {name} IDs into {type(id_set).__name__} ({id_set.nbytes() / 1024:.1f} KiB)")
+    return id_sets
+
+def find_orphans(db, id_sets):
+    """Second pass: stream each referencing collection once and yield dangling references."""
+    checks_by_collection = defaultdict(list)
+    for collection_name, field, target in CHECKS:
+        checks_by_collection[collection_name].append((field, target))
+
+    for collection_name, checks in checks_by_collection.items():
+        fields = [field for field, _ in checks]
+        for doc in db.collection(collection_name).select(fields).stream():
+            data = doc.to_dict() or {}
+            for field, target in checks:
+                values = data.get(field)
+                for value in values if isinstance(values, list) else [values]:
+                    # Empty references such as a deposit's relatedOrderId are allowed
+                    if value and value not in id_sets[target]:
+                        yield {"collection": collection_name, "id": doc.id, "field": field,
+                               "value": value, "target": target}
+
+def validate(db, output=None, bloom_threshold=0):
+    """Run both passes and return orphan counts per check."""
+    id_sets = load_id_sets(db, bloom_threshold)
+    counts = defaultdict(int)
+    samples = defaultdict(list)
+
+    out = open(output, "w", encoding="utf-8") if output else None
+    try:
+        for orphan in find_orphans(db, id_sets):
+            key = (orphan["collection"], orphan["field"], orphan["target"])
+            counts[key] += 1
+            if len(samples[key]) < SAMPLES_PER_CHECK:
+                samples[key].append(f"{orphan['id']} -> {orphan['value']}")
+            if out:
+                out.write(json.dumps(orphan) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    print(f"\n{'check':<40} {'orphans':>8}")
+    for collection_name, field, target in CHECKS:
+        key = (collection_name, field, target)
+        print(f"{collection_name + '.' + field + ' -> ' + target:<40} {counts[key]:>8}")
+        for sample in samples[key]:
+            print(f"    {sample}")
+    return counts
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check that references between collections point at real documents.")
+    parser.add_argument("--output", help="write every orphan to this JSONL file")
+    parser.add_argument("--bloom-threshold", type=int, default=0,
+                        help="use a Bloom filter for collections with more IDs than this (default: never)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print("Starting referential integrity check...")
+
+    db = initialize_firebase()
+    if not db:
+        print("Failed to initialize Firebase. Exiting.")
+        return
+
+    counts = validate(db, args.output, args.bloom_threshold)
+    total = sum(counts.values())
+    print(f"\nFound {total} orphaned references")
+    if args.output:
+        print(f"Orphans written to {args.output}")
+    if total:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()